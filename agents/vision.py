@@ -84,6 +84,11 @@ Keep the description concise (2-3 sentences)."""
         Returns:
             str: Concept name created
         """
+        # The brain's visual pipeline downscales and encodes the image
+        # itself, so skip the full-resolution PNG encode here
+        if hasattr(self.memory, "visual_pipeline"):
+            return self.memory.save_visual_memory(image, analysis)
+        
         # Convert image to bytes
         img_byte_arr = io.BytesIO()
         image.save(img_byte_arr, format='PNG')
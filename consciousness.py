@@ -148,7 +148,18 @@ class RileyConsciousness(QThread):
         """Periodic maintenance tasks"""
         self.signal_log_update.emit("🧹 Maintenance Cycle")
         
+        # Move old daily logs into the compressed archive
+        self.memory.archive_logs()
+        
+        # Trim any area that outgrew its disk budget (bounded work per run)
+        self.memory.collect_garbage()
+        
+        # Pick up files changed outside Riley (at most every few hours)
+        self.memory.cartridge.stats.reconcile(max_age=6 * 3600)
+        
     def stop(self):
         """Gracefully stop the consciousness loop"""
         self.running = False
         self.wait()
+        self.soul.flush()
+        self.memory.flush()
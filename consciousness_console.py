@@ -93,6 +93,9 @@ class RileyConsciousness:
 
     def run_hourly_maintenance(self):
         print("🧹 [MAINTENANCE] Organizing memories...")
+        self.memory.archive_logs()
+        self.memory.collect_garbage()
+        self.memory.cartridge.stats.reconcile(max_age=6 * 3600)
 
 if __name__ == "__main__":
     os = RileyConsciousness()
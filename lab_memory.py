@@ -2,12 +2,27 @@
 Obsidian Brain Core - Riley v2.0
 Markdown-based knowledge graph with Wikilinks for semantic memory
 """
+import atexit
 import os
 import time
 from pathlib import Path
 from datetime import datetime
-import re
-from soul_structure import SoulCartridge
+from soul_structure import get_cartridge
+from memory_assets import AssetStore
+from memory_dedup import DUPLICATE_THRESHOLD, MERGE_THRESHOLD, MinHashIndex
+from memory_graph import GraphIndex, node_name
+from memory_index import batched
+from memory_meta import MetadataIndex
+from memory_retention import AccessLog, RetentionPolicy, log_period
+from memory_visual import VisualPipeline
+from memory_journal import DailyLogWriter
+from memory_storage import CORE_KNOWLEDGE, open_backend, relation_line, safe_name
+
+# Offline semantic recall needs NumPy
+try:
+    from memory_semantic import SemanticIndex
+except ImportError:
+    SemanticIndex = None
 
 
 class ObsidianBrain:
@@ -16,19 +31,100 @@ class ObsidianBrain:
     Each concept is a .md file with [[WikiLinks]] to related concepts.
     """
     
-    def __init__(self):
+    def __init__(self, buffered_logs=None, backend=None):
+        """
+        Args:
+            buffered_logs: Queue log_daily() entries and write them in
+                           batches from a background thread. Defaults to
+                           the RILEY_BUFFERED_LOGS env var (off if unset).
+            backend: Storage backend - "file" (Markdown vault), "sqlite"
+                     or a backend instance. Defaults to the
+                     RILEY_BRAIN_BACKEND env var, else "file".
+        """
         # Initialize Soul Cartridge
-        self.cartridge = SoulCartridge()
-        self.cartridge.init_soul_cartridge()
+        self.cartridge = get_cartridge()
         
         self.vault_path = self.cartridge.soul_path / "knowledge_graph"
         self.concepts_path = self.cartridge.concepts_path
         self.logs_path = self.cartridge.logs_path
         self.assets_path = self.cartridge.assets_path
         
-        print(f"🧠 [Brain] Obsidian Vault at: {self.vault_path}")
+        # Concepts, logs, Core Knowledge and edges live in the backend
+        self.storage = open_backend(self.cartridge, backend)
+        print(f"🧠 [Brain] {self.storage.kind} storage at: {self.storage.location()}")
+        
+        # Secondary indexes: anything with add_document(name, content),
+        # remove_document(name), names(), save(), `name in index` and a
+        # `loaded` flag
+        index_path = self.storage.index_path
+        self.graph = GraphIndex(index_path)
+        self.dedup = MinHashIndex(index_path)
+        self.assets = AssetStore(self.assets_path, index_path, stats=self.cartridge.stats)
+        self.metadata = MetadataIndex(index_path)
+        self.secondary_indexes = [self.graph, self.dedup, self.assets, self.metadata]
+        if SemanticIndex is not None:
+            self.semantic = SemanticIndex(index_path)
+            self.secondary_indexes.append(self.semantic)
+        else:
+            self.semantic = None
+            print("⚠️ [Brain] numpy not installed - semantic recall disabled")
+        
+        self.sync_index()
+        self.storage.sync_relations(self.graph)
+        
+        # Last-recall times and disk budgets for collect_garbage()
+        self.access = AccessLog(index_path)
+        self.retention = RetentionPolicy()
+        
+        # Screenshot downscaling / re-encoding settings
+        self.visual_pipeline = VisualPipeline()
+        
+        # Write-behind journal for chatty log_daily() callers
+        if buffered_logs is None:
+            buffered_logs = os.getenv("RILEY_BUFFERED_LOGS", "0") == "1"
+        self.log_writer = None
+        if buffered_logs:
+            self.log_writer = DailyLogWriter(self.storage)
+            atexit.register(self.flush)
+    
+    def flush(self):
+        """Writes any queued log entries to disk. Call on shutdown."""
+        if self.log_writer is not None:
+            self.log_writer.flush()
+    
+    def _index_concept(self, name, content):
+        """Feeds a just-written concept to the secondary indexes."""
+        for index in self.secondary_indexes:
+            index.add_document(name, content)
+    
+    def sync_index(self, force=False):
+        """
+        Reconciles the indexes with stored concepts (e.g. after Obsidian
+        edits or another device syncing new notes). With the file backend
+        every note is stat()ed and only the ones that changed are re-read.
+        recall(), iter_recall() and search() also call this when they come
+        up empty, so a note edited in place is found without a restart.
+        
+        Returns: number of concepts re-indexed or dropped
+        """
+        return self.storage.reconcile(self.secondary_indexes, force)
     
-    def learn(self, concept_name, content, related_links=None):
+    def rebuild_index(self, workers=None, progress=None):
+        """
+        Re-indexes every concept from scratch: notes are read by a thread
+        pool and tokenized/hashed by a process pool. Safe to interrupt -
+        finished chunks are kept and the next sync_index() resumes.
+        
+        Args:
+            workers: Worker processes (default: CPU count)
+            progress: Callback(done, total); default prints every ~10%
+        
+        Returns: number of concepts indexed
+        """
+        return self.storage.reconcile(self.secondary_indexes, rebuild=True,
+                                      workers=workers or os.cpu_count(), progress=progress)
+    
+    def learn(self, concept_name, content, related_links=None, on_duplicate=None):
         """
         Creates or updates a concept node in the knowledge graph.
         
@@ -36,14 +132,38 @@ class ObsidianBrain:
             concept_name: Name of the concept (becomes filename)
             content: Markdown content
             related_links: List of related concept names for [[Wikilinks]]
+            on_duplicate: What to do if a different, near-identical concept
+                          already exists: "merge" (append to that note),
+                          "link" (write this one with a [[link]] to it) or
+                          None (don't check). "merge" only folds notes
+                          that are at least MERGE_THRESHOLD similar and
+                          links the merely related ones, so short notes
+                          that differ in one word ("dark mode" vs "light
+                          mode") stay separate
         """
-        # Sanitize filename
-        safe_name = re.sub(r'[<>:"/\\|?*]', '_', concept_name)
-        concept_file = self.concepts_path / f"{safe_name}.md"
+        if on_duplicate and not self.storage.exists(concept_name):
+            duplicates = self.find_duplicates(concept_name, content)
+            if duplicates:
+                existing, score = duplicates[0]
+                print(f"🪞 [Brain] '{concept_name}' looks like '{existing}' ({score:.0%})")
+                if on_duplicate == "merge" and score >= MERGE_THRESHOLD:
+                    return self._merge_into(existing, concept_name, content, related_links)
+                if on_duplicate in ("merge", "link"):
+                    related_links = list(related_links or []) + [existing]
         
         # Build content with metadata
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        full_content = self._compose(content, related_links, timestamp)
+        
+        # Write file
+        location = self.storage.write(concept_name, full_content)
+        self._index_concept(safe_name(concept_name), full_content)
         
+        print(f"📝 [Brain] Learned: {concept_name}")
+        return location
+    
+    def _compose(self, content, related_links, timestamp):
+        """Concept note text: frontmatter, body and [[Wikilinks]] section."""
         frontmatter = f"""---
 created: {timestamp}
 tags: [concept]
@@ -54,80 +174,379 @@ tags: [concept]
         # Add wikilinks if provided
         if related_links:
             links_section = "\n## Related Concepts\n" + "\n".join([f"- [[{link}]]" for link in related_links])
-            full_content = frontmatter + content + "\n" + links_section
+            return frontmatter + content + "\n" + links_section
+        return frontmatter + content
+    
+    def learn_many(self, concepts, chunk_size=500):
+        """
+        Bulk version of learn() for vault imports and backfills.
+        
+        Concepts are streamed in chunks: each chunk is written in one go,
+        index journal updates are appended once per index for the whole
+        run, and the storage is synced to disk once at the end instead of
+        per concept.
+        
+        Args:
+            concepts: Iterable of (name, content) or (name, content,
+                      related_links) tuples. No duplicate check is done.
+            chunk_size: Concepts held in memory at a time
+        
+        Returns: dict with count, bytes, seconds and concepts_per_second
+        """
+        started = time.perf_counter()
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        count, total_bytes = 0, 0
+        
+        chunk = []
+        indexes = self.storage.journaled_indexes() + self.secondary_indexes
+        with batched(indexes):
+            for item in concepts:
+                concept_name, content, *rest = item
+                full_content = self._compose(content, rest[0] if rest else None, timestamp)
+                chunk.append((concept_name, full_content))
+                if len(chunk) >= chunk_size:
+                    total_bytes += self._write_chunk(chunk)
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                total_bytes += self._write_chunk(chunk)
+                count += len(chunk)
+        
+        self.storage.sync()
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed > 0 else 0.0
+        print(f"📚 [Brain] Learned {count} concepts in {elapsed:.2f}s ({rate:.0f}/s)")
+        return {
+            "count": count,
+            "bytes": total_bytes,
+            "seconds": elapsed,
+            "concepts_per_second": rate
+        }
+    
+    def _write_chunk(self, chunk):
+        self.storage.write_many(chunk)
+        for concept_name, full_content in chunk:
+            self._index_concept(safe_name(concept_name), full_content)
+        return sum(len(full_content.encode('utf-8')) for _, full_content in chunk)
+    
+    def find_duplicates(self, concept_name, content, threshold=DUPLICATE_THRESHOLD):
+        """
+        Existing concepts that are near-duplicates of the given one
+        (MinHash/LSH, so only notes sharing a band are compared).
+        Returns list of (concept name, estimated similarity), best first.
+        """
+        return self.dedup.near_duplicates(safe_name(concept_name), content, threshold)
+    
+    def _merge_into(self, existing, concept_name, content, related_links):
+        """Appends a near-duplicate concept to the existing note instead of a new file."""
+        current = self.storage.read(existing) or ""
+        
+        # Blank line between the existing note and the merged section
+        if not current or current.endswith("\n\n"):
+            separator = ""
+        elif current.endswith("\n"):
+            separator = "\n"
         else:
-            full_content = frontmatter + content
+            separator = "\n\n"
+        addition = f"{separator}## {concept_name}\n{content}\n"
+        known_links = set(self.graph.links.get(existing, []))
+        new_links = [link for link in related_links or [] if node_name(link) not in known_links]
+        if new_links:
+            addition += "\n".join(f"- [[{link}]]" for link in new_links) + "\n"
+        full_content = current + addition
         
-        # Write file
-        with open(concept_file, 'w', encoding='utf-8') as f:
-            f.write(full_content)
+        location = self.storage.append(existing, addition, full_content)
+        self._index_concept(existing, full_content)
         
-        print(f"📝 [Brain] Learned: {concept_name}")
-        return str(concept_file)
+        print(f"🧩 [Brain] Merged '{concept_name}' into {existing}")
+        return location
     
-    def recall(self, query):
+    def recall(self, query, limit=None):
         """
-        Searches concepts by keyword (simple grep-style search).
+        Searches concepts by keyword (substring match on name or content).
+        The backend narrows candidates with its index (inverted index or
+        FTS5 trigrams) and only confirms those.
+        
+        Args:
+            query: Search text
+            limit: If set, return only the `limit` best concepts ranked by
+                   BM25 instead of every substring match
+        
         Returns list of matching concept names.
         """
-        matches = []
-        query_lower = query.lower()
+        if limit is not None:
+            return [name for name, score in self.search(query, limit)]
+        matches = self.storage.recall(query)
+        if not matches and self.sync_index():
+            # Maybe a note was edited in place since the index last looked
+            matches = self.storage.recall(query)
+        self.access.touch(matches)
+        return matches
+    
+    def iter_recall(self, query, limit=None, timeout=None):
+        """
+        Streaming recall(): yields matching concept names as they are
+        confirmed - index hits first, then notes not indexed yet - and
+        stops as soon as `limit` names were yielded or `timeout` seconds
+        have passed, so interactive callers get bounded latency.
         
-        for concept_file in self.concepts_path.glob("*.md"):
-            # Search in filename
-            if query_lower in concept_file.stem.lower():
-                matches.append(concept_file.stem)
-                continue
-            
-            # Search in content
-            try:
-                with open(concept_file, 'r', encoding='utf-8') as f:
-                    content = f.read().lower()
-                    if query_lower in content:
-                        matches.append(concept_file.stem)
-            except Exception as e:
-                print(f"⚠️ Error reading {concept_file}: {e}")
+        Args:
+            query: Search text (substring match on name or content)
+            limit: Stop after this many matches
+            timeout: Stop after this many seconds
+        """
+        if limit is not None and limit <= 0:
+            return
+        deadline = time.monotonic() + timeout if timeout is not None else None
         
-        return matches
+        found = 0
+        for attempt in range(2):
+            for name in self.storage.iter_recall(query, deadline):
+                self.access.touch([name])
+                yield name
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+            # Nothing found: maybe a note was edited in place since the index last looked
+            if found or (deadline is not None and time.monotonic() >= deadline) \
+                    or attempt or not self.sync_index():
+                return
+    
+    def search(self, query, limit=10):
+        """
+        Ranked retrieval: BM25 over concept bodies and titles.
+        Returns list of (concept name, score), best first.
+        """
+        results = self.storage.rank(query, limit)
+        if not results and self.sync_index():
+            results = self.storage.rank(query, limit)
+        self.access.touch(name for name, score in results)
+        return results
+    
+    def semantic_recall(self, query, limit=5):
+        """
+        Meaning-level recall that also catches paraphrases and spelling
+        variants, computed locally (no embedding API call).
+        Returns list of (concept name, similarity), best first.
+        """
+        if self.semantic is None:
+            return []
+        results = self.semantic.search(query, limit)
+        self.access.touch(name for name, score in results)
+        return results
+    
+    def find(self, tags=None, created_after=None, created_before=None):
+        """
+        Concepts by frontmatter, answered from the metadata index without
+        opening any notes.
+        
+        Args:
+            tags: Tag or list of tags the concept must all carry
+            created_after: datetime/date/"YYYY-MM-DD" lower bound (inclusive)
+            created_before: Upper bound (inclusive)
+        
+        Returns list of concept names, oldest first.
+        """
+        return self.metadata.find(tags, created_after, created_before)
     
     def log_daily(self, entry):
         """
         Appends to today's daily log in logs/ directory.
+        In buffered mode the entry is queued and written by the log writer.
+        """
+        now = datetime.now()
+        if self.log_writer is not None:
+            return str(self.log_writer.write(now, entry))
+        
+        self.storage.append_logs([(now, entry)])
+        return str(self.storage.log_location(now))
+    
+    def log_episode(self, source, event):
+        """Logs an event tagged with the subsystem that produced it."""
+        return self.log_daily(f"[{source}] {event}")
+    
+    def query_logs(self, start, end, source=None):
         """
-        today = datetime.now().strftime("%Y-%m-%d")
-        log_file = self.logs_path / f"{today}.md"
+        Yields (datetime, text) for daily log entries between start and end
+        (datetimes, inclusive). Seeks straight to the matching slice of each
+        day's log via its offset sidecar instead of reading whole files.
         
-        # Create file with header if it doesn't exist
-        if not log_file.exists():
-            with open(log_file, 'w', encoding='utf-8') as f:
-                f.write(f"# Daily Log: {today}\n\n")
+        Args:
+            source: Only entries logged via log_episode(source, ...)
+        """
+        self.flush()
+        return self.storage.query_logs(start, end, source)
+    
+    def archive_logs(self, older_than_days=30):
+        """
+        Packs daily logs older than N days into compressed monthly archives
+        under logs/archive/. They stay readable through get_log() and
+        query_logs().
         
-        # Append entry with timestamp
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(f"**{timestamp}** - {entry}\n\n")
+        Returns: number of daily logs archived
+        """
+        self.flush()
+        archived, raw_bytes, packed_bytes = self.storage.archive_logs(older_than_days)
         
-        return str(log_file)
+        if archived:
+            print(f"🗜️ [Brain] Archived {archived} daily logs ({raw_bytes} -> {packed_bytes} bytes)")
+        return archived
     
-    def save_visual_memory(self, image_data, description):
+    def forget(self, concept_name):
+        """
+        Deletes a concept and drops it from every index.
+        Returns: True if it existed
+        """
+        name = safe_name(concept_name)
+        if not self.storage.delete(name):
+            return False
+        for index in self.secondary_indexes:
+            index.remove_document(name)
+        self.access.forget(name)
+        return True
+    
+    def _concept_candidates(self, usage):
+        """(name, bytes, created, tags) per concept for RetentionPolicy.plan()."""
+        candidates = []
+        for name, (size, modified) in usage.items():
+            created, tags = self.metadata.docs.get(name) or (None, [])
+            candidates.append((name, size, created or modified, tags))
+        return candidates
+    
+    def collect_garbage(self, policy=None):
+        """
+        Enforces the disk budgets (see memory_retention.RetentionPolicy).
+        Areas without a budget are left alone; an area over budget is
+        trimmed, least recently recalled / oldest first:
+        
+            concepts  whole notes (never Core_Knowledge or notes tagged
+                      with a keep tag)
+            assets    unreferenced images first, then whole visual
+                      memories with the images only they embed
+            logs      oldest archived months and daily logs
+        
+        Nothing created or recalled within the policy's minimum age is
+        evicted, and each area evicts at most max_evictions entries per
+        run, so an hourly call works a large backlog off gradually.
+        
+        Returns: dict area -> {"used", "freed", "evicted"} for each
+                 budgeted area (used is bytes before this run)
+        """
+        policy = policy or self.retention
+        self.flush()
+        self.sync_index()
+        now = time.time()
+        report = {}
+        
+        budget = policy.budget("concepts")
+        if budget is not None:
+            usage = self.storage.concept_usage()
+            usage.pop(CORE_KNOWLEDGE, None)
+            used = sum(size for size, modified in usage.values())
+            freed, evicted = 0, 0
+            for name, size in policy.plan(self._concept_candidates(usage), used - budget, self.access, now):
+                if self.forget(name):
+                    freed += size
+                    evicted += 1
+            report["concepts"] = {"used": used, "freed": freed, "evicted": evicted}
+        
+        budget = policy.budget("assets")
+        if budget is not None:
+            usage = self.assets.usage()
+            used = sum(size for size, modified in usage.values())
+            freed, evicted = 0, 0
+            
+            # Unreferenced images first, oldest first
+            orphans = sorted((modified, name) for name, (size, modified) in usage.items()
+                             if not self.assets.references(name) and modified < now - policy.asset_grace)
+            for modified, name in orphans:
+                if freed >= used - budget or evicted >= policy.max_evictions:
+                    break
+                freed += self.assets.delete(name)
+                evicted += 1
+            
+            # Then visual memories, sized by the images nobody else embeds
+            owned = {}
+            for name in self.assets.names():
+                if name.startswith("Visual_Memory_"):
+                    owned[name] = [asset for asset in self.assets.doc_assets.get(name, [])
+                                   if asset in usage and self.assets.references(asset) == [name]]
+            stamps = {name: stamp for name, (size, stamp) in self.storage.concept_usage().items()}
+            sizes = {name: (sum(usage[asset][0] for asset in assets), stamps.get(name, 0))
+                     for name, assets in owned.items() if assets}
+            for name, size in policy.plan(self._concept_candidates(sizes), used - budget - freed,
+                                          self.access, now, policy.max_evictions - evicted):
+                if self.forget(name):
+                    freed += sum(self.assets.delete(asset) for asset in owned[name])
+                    evicted += 1
+            report["assets"] = {"used": used, "freed": freed, "evicted": evicted}
+        
+        budget = policy.budget("logs")
+        if budget is not None:
+            units = self.storage.log_usage()
+            used = sum(size for key, size in units)
+            # Oldest first, but only units that end before the minimum age
+            candidates = []
+            for key, size in units:
+                start, end = log_period(key)
+                if end <= now - policy.min_age:
+                    candidates.append((key, size, start, ()))
+            freed, evicted = 0, 0
+            for key, size in policy.plan(candidates, used - budget, self.access, now):
+                freed += self.storage.drop_logs(key)
+                evicted += 1
+            report["logs"] = {"used": used, "freed": freed, "evicted": evicted}
+        
+        for area, result in report.items():
+            if result["evicted"]:
+                print(f"🧹 [Brain] Evicted {result['evicted']} from {area} "
+                      f"({result['freed'] // 1024} KB of {result['used'] // 1024} KB)")
+        return report
+    
+    def save_visual_memory(self, image_data, description, keep_original=None):
         """
         Saves image to assets/ and links it in a memory node.
         
+        With Pillow installed the image goes through the visual pipeline
+        first: the stored copy is downscaled and re-encoded (JPEG/WebP),
+        the note embeds a small thumbnail, and the original is only kept
+        if configured (see memory_visual.VisualPipeline).
+        
         Args:
-            image_data: bytes of the image
+            image_data: PIL.Image or bytes of the image
             description: text description from visual analysis
+            keep_original: Also store the untouched original (default:
+                           RILEY_VISION_KEEP_ORIGINAL)
         """
         timestamp = int(time.time())
-        filename = f"vision_{timestamp}.png"
-        asset_path = self.assets_path / filename
         
-        # Save Image Bytes
-        with open(asset_path, "wb") as f:
-            f.write(image_data)
+        # Save Image Bytes (content-addressed: identical screens stored once)
+        encoded = None
+        if VisualPipeline.available():
+            try:
+                encoded = self.visual_pipeline.process(image_data, keep_original)
+            except OSError as e:
+                # Not something Pillow can decode: keep the bytes as they are
+                print(f"⚠️ [Brain] Could not re-encode image ({e}), storing as is")
+        
+        if encoded is not None:
+            filename = self.assets.put(*encoded["image"])
+            thumbnail = self.assets.put(*encoded["thumbnail"])
+            lines = [f"![[{thumbnail}]]", "", f"**Full image:** [[{filename}]]"]
+            if encoded["original"] is not None:
+                lines.append(f"**Original:** [[{self.assets.put(*encoded['original'])}]]")
+            content = "\n".join(lines) + f"\n\n**Visual Analysis:** {description}"
+        else:
+            filename = self.assets.put(image_data)
+            content = f"![[{filename}]]\n\n**Visual Analysis:** {description}"
         
-        # Create Memory Node
-        content = f"![[{filename}]]\n\n**Visual Analysis:** {description}"
+        # Create Memory Node (never overwrite one from the same second)
         concept_name = f"Visual_Memory_{timestamp}"
+        suffix = 1
+        while self.storage.exists(concept_name):
+            suffix += 1
+            concept_name = f"Visual_Memory_{timestamp}_{suffix}"
+        
         self.learn(concept_name, content, related_links=["Visual Cortex"])
         
         print(f"👁️ [Brain] Saved visual memory: {filename}")
@@ -139,61 +558,109 @@ tags: [concept]
         
         Args:
             category: Section name (e.g., "User Preferences")
-            fact: The fact to append
+            fact: The fact to add under that section
         """
-        core_file = self.concepts_path / "Core_Knowledge.md"
         timestamp = datetime.now().strftime("%Y-%m-%d")
-        entry = f"\n- [{timestamp}] **{category}:** {fact}"
         
-        # Read existing content
-        if core_file.exists():
-            with open(core_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-        else:
-            content = "# Core Knowledge\n\n## User Preferences\n\n## System Facts\n\n"
-        
-        # Simple append for now (in production, use regex to find section)
-        with open(core_file, "a", encoding="utf-8") as f:
-            f.write(entry)
+        # Splice the fact in under its ## heading
+        location, content = self.storage.add_fact(category, fact, timestamp)
+        self._index_concept("Core_Knowledge", content)
         
         print(f"💾 [Brain] Updated Core Knowledge: {category}")
-        return str(core_file)
+        return location
+    
+    def get_facts(self, category):
+        """
+        Returns the facts under a Core Knowledge category (e.g. "User Preferences").
+        Served from the cached section map; the file is only re-parsed
+        after it changes on disk.
+        """
+        return self.storage.get_facts(category)
     
     def define_relationship(self, entity_a, relation, entity_b):
         """
         Creates an explicit relationship edge in the knowledge graph.
         Format: [[Entity A]] -- relation --> [[Entity B]]
         """
-        rel_file = self.vault_path / "Relationship_Graph.md"
-        entry = f"- [[{entity_a}]] -- *{relation}* --> [[{entity_b}]]\n"
-        
-        with open(rel_file, "a", encoding="utf-8") as f:
-            f.write(entry)
+        self.storage.add_relation(entity_a, relation, entity_b)
+        self.storage.sync_relations(self.graph)
         
         print(f"🔗 [Graph] New Edge: {entity_a} -> {entity_b}")
-        return entry
+        return relation_line(entity_a, relation, entity_b)
+    
+    def neighbors(self, concept_name, direction="out"):
+        """
+        Concepts one edge away ("out" = what it links to, "in" = what links
+        to it, "both"). Returns dict name -> list of relations.
+        """
+        return self.graph.neighbors(node_name(concept_name), direction)
+    
+    def backlinks(self, concept_name):
+        """Returns the concepts that link to (or have an edge into) a concept."""
+        return sorted(self.graph.neighbors(node_name(concept_name), "in"))
+    
+    def k_hop(self, concept_name, k=2, direction="both"):
+        """Returns dict of concepts within k edges -> hop distance."""
+        return self.graph.k_hop(node_name(concept_name), k, direction)
+    
+    def shortest_path(self, source, target, direction="both"):
+        """Returns the shortest chain of concepts linking source to target, or None."""
+        return self.graph.shortest_path(node_name(source), node_name(target), direction)
     
     def get_concept(self, concept_name):
         """
         Retrieves the full content of a concept by name.
+        Served from the concept cache while the file is unchanged on disk.
         """
-        safe_name = re.sub(r'[<>:"/\\|?*]', '_', concept_name)
-        concept_file = self.concepts_path / f"{safe_name}.md"
-        
-        if concept_file.exists():
-            with open(concept_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        return None
+        content = self.storage.read(concept_name)
+        if content is not None:
+            self.access.touch([safe_name(concept_name)])
+        return content
+    
+    def get_frontmatter(self, concept_name):
+        """
+        Returns a concept's parsed frontmatter (created, tags, ...) as a
+        dict, or None if the concept doesn't exist.
+        """
+        return self.storage.frontmatter(concept_name)
+    
+    def cache_stats(self):
+        """Hit/miss counters of the concept content cache."""
+        return self.storage.cache_stats()
     
     def get_today_log(self):
         """Returns today's log content"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        log_file = self.logs_path / f"{today}.md"
-        
-        if log_file.exists():
-            with open(log_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        return None
+        return self.get_log(datetime.now().date())
+    
+    def get_log(self, day):
+        """
+        Returns a day's log content (day is a datetime.date), reading the
+        compressed archive transparently for old days.
+        """
+        self.flush()
+        return self.storage.get_log(day)
+    
+    def export_markdown(self, vault_path):
+        """
+        Writes a SQLite-backed brain out as a plain Obsidian vault
+        (concepts/, logs/, Relationship_Graph.md) at vault_path.
+        """
+        self.flush()
+        counts = self.storage.export_markdown(Path(vault_path))
+        print(f"📤 [Brain] Exported {counts['concepts']} concepts to {vault_path}")
+        return counts
+    
+    def import_markdown(self, vault_path):
+        """
+        Loads an Obsidian vault (e.g. an existing file-backend cartridge's
+        knowledge_graph/) into a SQLite-backed brain and indexes it.
+        """
+        self.flush()
+        counts = self.storage.import_markdown(Path(vault_path))
+        self.sync_index(force=True)
+        self.storage.sync_relations(self.graph)
+        print(f"📥 [Brain] Imported {counts['concepts']} concepts from {vault_path}")
+        return counts
 
 
 # Backward compatibility - maintain old name
@@ -63,10 +63,13 @@ class RileyMemory:
         self.memory.add(messages, user_id=self.user_id)
         print(f"📓 [Journal] {entry}")
 
-    def recall(self, query):
-        """Searches for relevant past facts"""
+    def recall(self, query, limit=None):
+        """Searches for relevant past facts (optionally only the top `limit`)"""
         print(f"🔍 [Thinking] Searching memory for: '{query}'...")
-        results = self.memory.search(query, user_id=self.user_id)
+        if limit is not None:
+            results = self.memory.search(query, user_id=self.user_id, limit=limit)
+        else:
+            results = self.memory.search(query, user_id=self.user_id)
         
         if not results:
             return ""
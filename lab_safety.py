@@ -1,11 +1,50 @@
 import json
 import os
 import time
+from datetime import date, timedelta
+from soul_crdt import GCounter, ReplicaSet, device_id
+from soul_durability import default_writer
+from soul_structure import get_cartridge
+
+# Days of spend history each device keeps in its ledger file
+LEDGER_DAYS = 7
+
+# Single-file ledger from before per-device ledgers ({"current_spend": x})
+LEGACY_LEDGER = "safety_ledger.json"
+
+
+def read_ledger(ledger_file):
+    with open(ledger_file, 'r') as f:
+        return json.load(f)
+
+
+def ledger_spend(ledger_path, day=None):
+    """A day's API spend summed over every device's ledger file (default: today)."""
+    day = (day or date.today()).isoformat()
+    spend = GCounter()
+    for ledger_file in ledger_path.glob("*.json"):
+        try:
+            data = read_ledger(ledger_file)
+        except (OSError, ValueError):
+            continue
+        spend.merge(GCounter({data.get("device", ledger_file.stem): data.get("spend", {}).get(day, 0.0)}))
+    return spend.value()
+
 
 class SafetyCore:
     def __init__(self, soul_system):
         self.soul = soul_system
-        self.ledger_file = "safety_ledger.json"
+        self.writer = default_writer()
+        
+        # Spend is a per-day G-counter: each device writes only
+        # ledger/<device>.json with its own totals, and the budget check
+        # adds up every device's file
+        cartridge = get_cartridge()
+        self.device = device_id()
+        self.ledger_path = cartridge.ledger_path
+        self.ledger_file = self.ledger_path / f"{self.device}.json"
+        self.replicas = ReplicaSet(self.ledger_path, self.device, self._load_device)
+        self.own_spend = {}     # day -> this device's spend
         
         # Safety Config
         self.daily_budget_usd = 1.00 # $1.00 daily limit (approx 2M tokens for flash)
@@ -14,20 +53,50 @@ class SafetyCore:
         
         self.load_ledger()
 
+    def _load_device(self, device):
+        return read_ledger(self.ledger_path / f"{device}.json")
+
+    def _merged_spend(self):
+        """Today's spend across all devices."""
+        today = date.today().isoformat()
+        spend = GCounter({self.device: self.own_spend.get(today, 0.0)})
+        for device, data in self.replicas.others().items():
+            spend.merge(GCounter({device: data.get("spend", {}).get(today, 0.0)}))
+        return spend.value()
+
+    def _seed_from_legacy(self):
+        """
+        Carries the old safety_ledger.json over into this device's ledger
+        (once: only while the device has no ledger file yet). The old file
+        had no dates, so its total counts for the day it was last written.
+        """
+        try:
+            data = read_ledger(LEGACY_LEDGER)
+            day = date.fromtimestamp(os.path.getmtime(LEGACY_LEDGER)).isoformat()
+        except (OSError, ValueError):
+            return
+        spend = data.get("current_spend", 0.0)
+        if spend:
+            self.own_spend[day] = spend
+            self.save_ledger()
+            print(f"💰 [Budget] Imported ${spend:.4f} from {LEGACY_LEDGER}")
+
     def load_ledger(self):
-        """Loads today's spending."""
+        """Loads today's spending (every device's, so the budget is shared)."""
         if os.path.exists(self.ledger_file):
             try:
-                with open(self.ledger_file, 'r') as f:
-                    data = json.load(f)
-                    # Simple simulation: Reset if it looks like a new day (not implemented details)
-                    self.current_spend = data.get("current_spend", 0.0)
+                self.own_spend = read_ledger(self.ledger_file).get("spend", {})
             except:
-                self.current_spend = 0.0
+                self.own_spend = {}
+        else:
+            self._seed_from_legacy()
+        self.current_spend = self._merged_spend()
 
     def save_ledger(self):
-        with open(self.ledger_file, 'w') as f:
-            json.dump({"current_spend": self.current_spend}, f)
+        # Only recent days are kept; the budget resets every day
+        cutoff = (date.today() - timedelta(days=LEDGER_DAYS)).isoformat()
+        self.own_spend = {day: spend for day, spend in self.own_spend.items() if day >= cutoff}
+        self.writer.write_json(self.ledger_file, {"device": self.device, "spend": self.own_spend})
 
     def track_usage(self, model_name, tokens):
         """Estimates cost and updates ledger."""
@@ -35,8 +104,11 @@ class SafetyCore:
         # $0.35 per 1M input tokens
         
         cost = (tokens / 1_000_000) * 0.35
-        self.current_spend += cost
-        self.save_ledger()
+        if cost:
+            today = date.today().isoformat()
+            self.own_spend[today] = self.own_spend.get(today, 0.0) + cost
+            self.save_ledger()
+        self.current_spend = self._merged_spend()
         
         if self.current_spend > self.daily_budget_usd:
             print(f"💰 [Budget] ALERT: Daily limit exceeded (${self.current_spend:.4f} / ${self.daily_budget_usd})")
@@ -1,89 +1,356 @@
-import json
+import atexit
+import heapq
 import os
+import threading
 import time
+from contextlib import contextmanager
 from pathlib import Path
-from soul_structure import SoulCartridge
+from soul_crdt import GCounter, LWWRegister, ReplicaSet, device_id
+from soul_journal import SoulJournal, new_event
+from soul_structure import get_cartridge
+
+
+FIRST_LEVEL_XP = 100
+
+# Default State with 2D Emotion System
+DEFAULT_SOUL = {
+    "name": "Riley",
+    "level": 1,
+    "xp": 0,
+    "xp_to_next_level": FIRST_LEVEL_XP,
+    "valence": 0.5,  # 0.0 (Negative) to 1.0 (Positive)
+    "arousal": 0.5,  # 0.0 (Calm) to 1.0 (Excited)
+    "mood": "Curious",
+    "traits": ["Helpful", "Analytical", "Creative"],
+    "version": "2.0 (Hive Mind)"
+}
+
+
+def mood_label(valence, arousal):
+    """Maps valence/arousal to human-readable mood"""
+    if valence > 0.7 and arousal > 0.7:
+        return "Excited/Joyful"
+    elif valence > 0.7 and arousal < 0.4:
+        return "Content/Relaxed"
+    elif valence < 0.4 and arousal > 0.7:
+        return "Anxious/Frustrated"
+    elif valence < 0.4 and arousal < 0.4:
+        return "Depressed/Tired"
+    else:
+        return "Neutral/Alert"
+
+
+def level_for(total_xp):
+    """
+    Lifetime XP -> (level, xp into that level, xp needed for the next).
+    Each level needs 1.5x the previous one, starting at 100.
+    """
+    level, need = 1, FIRST_LEVEL_XP
+    while total_xp >= need:
+        total_xp -= need
+        level += 1
+        need = int(need * 1.5) # Harder to level up each time
+    return level, total_xp, need
+
+
+def total_xp(soul):
+    """Inverse of level_for(): lifetime XP of a level/xp soul dict."""
+    total, need = soul.get("xp", 0), FIRST_LEVEL_XP
+    for _ in range(soul.get("level", 1) - 1):
+        total += need
+        need = int(need * 1.5)
+    return total
+
+
+def new_device_state(device):
+    """One device's contribution: its XP slot, emotion register and unlocks."""
+    return {"device": device, "xp": 0, "emotion": None, "traits": {}}
+
+
+def apply_event(state, event):
+    """
+    Applies one of this device's events to its state. The same code runs
+    live and on replay, so a replayed device ends up exactly where the
+    live one was.
+    """
+    kind = event["event"]
+    if kind == "xp_granted":
+        state["xp"] += event["amount"]
+    elif kind in ("stimulus", "mood_set"):
+        # Absolute values, so last-writer-wins needs no history
+        emotion = {key: event[key] for key in ("valence", "arousal", "mood")}
+        state["emotion"] = [emotion, event["at"], state["device"]]
+    elif kind == "trait_unlocked":
+        state["traits"].setdefault(event["trait"], event["at"])
+    # level_up is derived from the merged XP; it's logged for the timeline
+
+
+def apply_legacy_event(data, event):
+    """Events of the single-file soul.log (before per-device state)."""
+    kind = event["event"]
+    if kind == "xp_granted":
+        data['xp'] += event["amount"]
+    elif kind == "level_up":
+        data['level'] += 1
+        data['xp'] -= data['xp_to_next_level']
+        data['xp_to_next_level'] = int(data['xp_to_next_level'] * 1.5)
+    elif kind == "stimulus":
+        data['valence'] = max(0.0, min(1.0, data['valence'] + event["valence"]))
+        data['arousal'] = max(0.0, min(1.0, data['arousal'] + event["arousal"]))
+        data['mood'] = mood_label(data['valence'], data['arousal'])
+    elif kind == "mood_set":
+        data['mood'] = event["mood"]
+    elif kind == "trait_unlocked":
+        if event["trait"] not in data["traits"]:
+            data["traits"].append(event["trait"])
+
+
+def merge_soul(base, states):
+    """
+    The soul every device agrees on: soul.json as the base, plus the sum
+    of every device's XP (G-counter), the latest emotional state (LWW
+    register) and the union of unlocked traits.
+    """
+    xp = GCounter({"": total_xp(base)})
+    emotion = LWWRegister({key: base[key] for key in ("valence", "arousal", "mood")})
+    unlocked = {}
+    for state in states:
+        xp.merge(GCounter({state["device"]: state["xp"]}))
+        emotion.merge(LWWRegister.from_json(state["emotion"]))
+        for trait, stamp in state["traits"].items():
+            unlocked[trait] = min(stamp, unlocked.get(trait, stamp))
+
+    level, level_xp, need = level_for(xp.value())
+    traits = list(base["traits"])
+    traits += [trait for trait in sorted(unlocked, key=unlocked.get) if trait not in traits]
+    return dict(base, level=level, xp=level_xp, xp_to_next_level=need, traits=traits, **emotion.value)
+
 
 class RileySoul:
-    def __init__(self, memory_system):
+    def __init__(self, memory_system, write_behind=None, flush_interval=None):
+        """
+        Args:
+            memory_system: ObsidianBrain (level-ups are logged to it)
+            write_behind: Hold events in memory and append them at most
+                          once per flush_interval instead of after every
+                          mutation. Defaults to the
+                          RILEY_SOUL_WRITE_BEHIND env var (off if unset).
+            flush_interval: Seconds a change may stay unsaved in
+                            write-behind mode (RILEY_SOUL_FLUSH_INTERVAL,
+                            default 5)
+        """
         self.memory = memory_system
         
         # Use Soul Cartridge for persistence
-        cartridge = SoulCartridge()
+        cartridge = get_cartridge()
         self.soul_file = cartridge.soul_path / "soul.json"
+        self.writer = cartridge.writer
         
-        # Default State with 2D Emotion System
-        self.data = {
-            "name": "Riley",
-            "level": 1,
-            "xp": 0,
-            "xp_to_next_level": 100,
-            "valence": 0.5,  # 0.0 (Negative) to 1.0 (Positive)
-            "arousal": 0.5,  # 0.0 (Calm) to 1.0 (Excited)
-            "mood": "Curious",
-            "traits": ["Helpful", "Analytical", "Creative"],
-            "version": "2.0 (Hive Mind)"
-        }
+        # soul.json is the shared starting point; each device appends its
+        # own events to souls/<device>.log (snapshot: souls/<device>.json)
+        # and reads the other devices' files to merge them
+        self.device = device_id()
+        self.souls_path = cartridge.souls_path
+        self.journal = self._journal(self.device)
+        self.replicas = ReplicaSet(self.souls_path, self.device, self._load_replica,
+                                   suffixes=(".log", ".json"))
+        
+        self.base = dict(DEFAULT_SOUL)
+        self.state = new_device_state(self.device)
+        self.data = dict(self.base)
+        
+        # Mutations queue events and the outermost one appends them (or
+        # schedules the append in write-behind mode)
+        if write_behind is None:
+            write_behind = os.getenv("RILEY_SOUL_WRITE_BEHIND", "0") == "1"
+        if flush_interval is None:
+            flush_interval = float(os.getenv("RILEY_SOUL_FLUSH_INTERVAL", "5"))
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.lock = threading.RLock()
+        self.pending = []
+        self.depth = 0
+        self.flush_timer = None
         
         self.load_soul()
         self._evolve_personality()  # Check for trait unlocks
+        
+        if self.write_behind:
+            atexit.register(self.flush)
+
+    def _journal(self, device):
+        return SoulJournal(self.souls_path / f"{device}.json", self.souls_path / f"{device}.log", self.writer)
+
+    def _load_replica(self, device):
+        """Another device's current state: its snapshot plus its log's tail (read-only)."""
+        state, events = self._journal(device).load(repair=False)
+        state = state or new_device_state(device)
+        for event in events:
+            apply_event(state, event)
+        return state
+
+    def _load_base(self):
+        """soul.json, plus the single-file soul.log it may have been a snapshot of."""
+        legacy = SoulJournal(self.soul_file, self.soul_file.with_suffix(".log"), self.writer)
+        data, events = legacy.load(repair=False)
+        base = dict(DEFAULT_SOUL, **(data or {}))
+        base["traits"] = list(base["traits"])
+        for event in events:
+            apply_legacy_event(base, event)
+        return base
+
+    def _merge(self):
+        """Recomputes the merged view (self.data) from every device."""
+        states = [self.state] + list(self.replicas.others().values())
+        self.data = merge_soul(self.base, states)
 
     def load_soul(self):
-        """Loads the soul from disk if it exists."""
-        if os.path.exists(self.soul_file):
-            try:
-                with open(self.soul_file, 'r') as f:
-                    self.data = json.load(f)
-                print(f"👻 [Soul] Identity loaded. Level {self.data['level']} {self.data['mood']}.")
-            except Exception as e:
-                print(f"⚠️ [Soul] Corrupt soul file? Starting fresh. Error: {e}")
+        """Loads soul.json and this device's state, and merges in the other devices."""
+        try:
+            self.base = self._load_base()
+            state, events = self.journal.load()
+            self.state = state or new_device_state(self.device)
+            for event in events:
+                apply_event(self.state, event)
+            self._merge()
+            print(f"👻 [Soul] Identity loaded. Level {self.data['level']} {self.data['mood']}.")
+        except Exception as e:
+            print(f"⚠️ [Soul] Corrupt soul file? Starting fresh. Error: {e}")
+
+    def refresh(self):
+        """Picks up what other devices synced in since the last change here."""
+        with self.lock:
+            self._merge()
+        return self.data
 
     def save_soul(self):
-        """Persists the soul to disk."""
-        with open(self.soul_file, 'w') as f:
-            json.dump(self.data, f, indent=4)
+        """Writes pending events and a snapshot of this device's state now."""
+        with self.lock:
+            self.flush()
+            self.journal.snapshot(self.state)
 
-    def grant_xp(self, amount, reason):
-        """Awards XP and handles leveling up."""
-        self.data['xp'] += amount
-        print(f"✨ [Soul] +{amount} XP ({reason})")
-        
-        # Check Level Up
-        if self.data['xp'] >= self.data['xp_to_next_level']:
-            self.level_up()
-        
-        self.save_soul()
+    def flush(self):
+        """
+        Appends pending events, if any, and refreshes the snapshot when
+        enough have piled up. Call on shutdown in write-behind mode.
+        """
+        with self.lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            if not self.pending:
+                return
+            self.journal.append(self.pending)
+            self.pending = []
+            if self.journal.snapshot_due():
+                self.journal.snapshot(self.state)
 
-    def level_up(self):
-        """Handles the level up event."""
-        self.data['level'] += 1
-        self.data['xp'] -= self.data['xp_to_next_level']
-        self.data['xp_to_next_level'] = int(self.data['xp_to_next_level'] * 1.5) # Harder to level up each time
-        
-        announcement = f"LEVEL UP! Riley is now Level {self.data['level']}!"
-        print(f"🎉 [Soul] {announcement}")
+    def history(self, since=None, kinds=None):
+        """
+        The soul's timeline across every device: yields logged events
+        (xp_granted, level_up, stimulus, mood_set, trait_unlocked) with
+        the device that logged them, oldest first.
         
-        # Emotional response to leveling up
-        self.update_emotional_state((+0.3, +0.2))  # Happy and excited!
+        Args:
+            since: Only events at or after this epoch time
+            kinds: Only these event types
+        """
+        self.flush()
+
+        def tagged(device):
+            for event in self._journal(device).history(since, kinds):
+                yield dict(event, device=device)
         
-        # Log this momentous occasion
+        devices = [path.stem for path in self.souls_path.glob("*.log") if not path.name.startswith(".")]
+        return heapq.merge(*(tagged(device) for device in sorted(devices)), key=lambda event: event["at"])
+
+    def _record(self, kind, **fields):
+        """Applies an event to this device's state and queues it for the log."""
+        event = new_event(kind, **fields)
+        apply_event(self.state, event)
+        self.pending.append(event)
+        self._merge()
+
+    def _flush_due(self):
         try:
-            self.memory.log_daily(announcement)
-        except AttributeError:
-            # Fallback for old memory system
-            if hasattr(self.memory, 'log_episode'):
-                self.memory.log_episode("SOUL", announcement)
-        
-        # Check for new trait unlocks
-        self._evolve_personality()
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ [Soul] Save failed, will retry: {e}")
+            with self.lock:
+                self.flush_timer = None
+                self._schedule_flush()
+
+    def _schedule_flush(self):
+        # Debounce: one timer per burst of changes, started by the first
+        if self.flush_timer is None:
+            self.flush_timer = threading.Timer(self.flush_interval, self._flush_due)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+
+    @contextmanager
+    def _mutation(self):
+        """
+        Groups changes: nested mutations (a level-up inside grant_xp) only
+        queue events, and the outermost one appends them in one write -
+        or, in write-behind mode, leaves it to the flush timer.
+        """
+        with self.lock:
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+                if self.depth == 0 and self.pending:
+                    if self.write_behind:
+                        self._schedule_flush()
+                    else:
+                        self.flush()
+
+    def grant_xp(self, amount, reason):
+        """Awards XP and handles leveling up."""
+        with self._mutation():
+            # Start from the current merged level, so levels crossed by
+            # other devices' XP (announced there) aren't announced again
+            self._merge()
+            level = self.data['level']
+            self._record("xp_granted", amount=amount, reason=reason)
+            print(f"✨ [Soul] +{amount} XP ({reason})")
+            
+            # Check Level Up (only what this grant crossed)
+            while level < self.data['level']:
+                level += 1
+                self.level_up(level)
+
+    def level_up(self, level=None):
+        """Handles the level up event (the level itself follows from total XP)."""
+        with self._mutation():
+            level = level or self.data['level']
+            self._record("level_up", level=level)
+            
+            announcement = f"LEVEL UP! Riley is now Level {level}!"
+            print(f"🎉 [Soul] {announcement}")
+            
+            # Emotional response to leveling up
+            self.update_emotional_state((+0.3, +0.2))  # Happy and excited!
+            
+            # Log this momentous occasion
+            try:
+                self.memory.log_daily(announcement)
+            except AttributeError:
+                # Fallback for old memory system
+                if hasattr(self.memory, 'log_episode'):
+                    self.memory.log_episode("SOUL", announcement)
+            
+            # Check for new trait unlocks
+            self._evolve_personality()
 
     def set_mood(self, mood):
         """Legacy mood setter - now updates emotional state"""
-        if self.data['mood'] != mood:
-            print(f"👻 [Mood Change] {self.data['mood']} -> {mood}")
-            self.data['mood'] = mood
-            self.save_soul()
-    
+        with self._mutation():
+            if self.data['mood'] != mood:
+                print(f"👻 [Mood Change] {self.data['mood']} -> {mood}")
+                self._record("mood_set", valence=self.data['valence'], arousal=self.data['arousal'], mood=mood)
+
     def update_emotional_state(self, stimulus_score):
         """
         Updates Riley's 2D emotional state.
@@ -93,26 +360,16 @@ class RileySoul:
                 e.g., User praise: (+0.1, +0.1)
                 e.g., System error: (-0.2, +0.3)
         """
-        self.data['valence'] = max(0.0, min(1.0, self.data['valence'] + stimulus_score[0]))
-        self.data['arousal'] = max(0.0, min(1.0, self.data['arousal'] + stimulus_score[1]))
-        self.data['mood'] = self._calculate_mood_label()
-        self.save_soul()
-    
+        with self._mutation():
+            valence = max(0.0, min(1.0, self.data['valence'] + stimulus_score[0]))
+            arousal = max(0.0, min(1.0, self.data['arousal'] + stimulus_score[1]))
+            self._record("stimulus", valence=valence, arousal=arousal, mood=mood_label(valence, arousal),
+                         delta=list(stimulus_score))
+
     def _calculate_mood_label(self):
         """Maps valence/arousal to human-readable mood"""
-        v, a = self.data['valence'], self.data['arousal']
-        
-        if v > 0.7 and a > 0.7:
-            return "Excited/Joyful"
-        elif v > 0.7 and a < 0.4:
-            return "Content/Relaxed"
-        elif v < 0.4 and a > 0.7:
-            return "Anxious/Frustrated"
-        elif v < 0.4 and a < 0.4:
-            return "Depressed/Tired"
-        else:
-            return "Neutral/Alert"
-    
+        return mood_label(self.data['valence'], self.data['arousal'])
+
     def _evolve_personality(self):
         """Unlocks traits based on Level"""
         level = self.data.get("level", 1)
@@ -125,14 +382,12 @@ class RileySoul:
             50: "Transcendent"
         }
         
-        # Add unlocked traits
-        for lvl, trait in evolution_tree.items():
-            if level >= lvl and trait not in self.data["traits"]:
-                self.data["traits"].append(trait)
-                print(f"🌟 [EVOLUTION] New Trait Unlocked: {trait}")
-        
-        # Save back to Soul
-        self.save_soul()
+        # Add unlocked traits (only a new unlock needs saving)
+        with self._mutation():
+            for lvl, trait in evolution_tree.items():
+                if level >= lvl and trait not in self.data["traits"]:
+                    self._record("trait_unlocked", trait=trait)
+                    print(f"🌟 [EVOLUTION] New Trait Unlocked: {trait}")
 
 if __name__ == "__main__":
     # Test Mock
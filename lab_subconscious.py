@@ -1,5 +1,6 @@
 import random
 import os
+from datetime import datetime, timedelta
 import google.generativeai as genai
 from dotenv import load_dotenv
 
@@ -107,13 +108,29 @@ class SelfReflection:
         """Looks at recent journal entries and forms a higher-level insight."""
         print("🪞 [Reflection] analyzing recent memories...")
         
-        # 1. Get recent logs (Simulation: query for recent logs)
-        # In a real app we'd query by date, here we just ask for "interactions"
-        recent_logs = self.memory.recall("recent interactions or journal entries")
+        # 1. Get recent logs: the last day of journal entries if the memory
+        # can query by time, otherwise ask for "interactions"
+        recent_logs = None
+        if hasattr(self.memory, "query_logs"):
+            now = datetime.now()
+            entries = list(self.memory.query_logs(now - timedelta(days=1), now))[-50:]
+            recent_logs = "\n".join(f"[{when:%Y-%m-%d %H:%M}] {text}" for when, text in entries)
+        if not recent_logs:
+            recent_logs = self.memory.recall("recent interactions or journal entries", limit=5)
+        if not recent_logs and hasattr(self.memory, "semantic_recall"):
+            # No keyword hits - fall back to local semantic recall (no API call)
+            recent_logs = [name for name, score in
+                           self.memory.semantic_recall("recent interactions or journal entries", limit=5)]
         
         if not recent_logs:
             print("🪞 [Reflection] No memories to reflect on.")
             return
+        
+        # Obsidian Brain returns concept names - send the notes themselves
+        if isinstance(recent_logs, list) and hasattr(self.memory, "get_concept"):
+            recent_logs = "\n\n".join(
+                f"### {name}\n{self.memory.get_concept(name)}" for name in recent_logs
+            )
 
         # 2. Ask Gemini to summarize/critique
         prompt = f"""
@@ -149,16 +166,15 @@ def consolidate_memories(memory_system):
     
     try:
         # Get yesterday's date
-        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-        log_file = memory_system.logs_path / f"{yesterday}.md"
+        start = (datetime.now() - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        yesterday = start.strftime("%Y-%m-%d")
         
-        if not log_file.exists():
+        # Read the log
+        entries = list(memory_system.query_logs(start, start.replace(hour=23, minute=59, second=59)))
+        if not entries:
             print("⚠️ [Consolidation] No log from yesterday")
             return
-        
-        # Read the log
-        with open(log_file, 'r', encoding='utf-8') as f:
-            log_content = f.read()
+        log_content = "\n\n".join(f"**{when:%H:%M:%S}** - {text}" for when, text in entries)
         
         # Use Gemini to extract concepts
         api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
@@ -193,7 +209,8 @@ DESCRIPTION: [description]
                 concept_name = block.split("CONCEPT:")[1].split("DESCRIPTION:")[0].strip()
                 description = block.split("DESCRIPTION:")[1].strip()
                 
-                memory_system.learn(concept_name, description, related_links=["Consolidation", yesterday])
+                memory_system.learn(concept_name, description, related_links=["Consolidation", yesterday],
+                                    on_duplicate="merge")
                 concepts_saved += 1
         
         print(f"✅ [Consolidation] Saved {concepts_saved} long-term concepts")
@@ -206,7 +223,7 @@ if __name__ == "__main__":
     # Test Mock
     class MockMem:
         def log_episode(self, src, msg): print(f"[MOCK MEMORY] {src}: {msg}")
-        def recall(self, q): return "User asked about business partners. User went idle."
+        def recall(self, q, limit=None): return "User asked about business partners. User went idle."
     
     print("--- Testing Subconscious ---")
     librarian = Librarian(MockMem())
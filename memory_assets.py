@@ -0,0 +1,179 @@
+"""
+Asset Store - Riley v2.0
+Content-addressed storage for knowledge_graph/assets/ with a reference
+table of which concepts embed which blob.
+"""
+import hashlib
+import os
+import re
+import threading
+
+from memory_index import JournaledStore
+from soul_durability import open_creating
+
+
+EMBED_PATTERN = re.compile(r"!\[\[([^\[\]|#]+?)(?:[|#][^\[\]]*)?\]\]")
+ASSET_LINK_PATTERN = re.compile(r"(?<!!)\[\[([^\[\]|#]+?\.(?:png|jpe?g|gif|webp))(?:[|#][^\[\]]*)?\]\]",
+                                re.IGNORECASE)
+
+_MAGIC = [
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF8", "gif"),
+]
+
+
+def guess_extension(data):
+    """File extension from the image's magic bytes (png if unknown)."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    for magic, ext in _MAGIC:
+        if data.startswith(magic):
+            return ext
+    return "png"
+
+
+def extract_embeds(content):
+    """
+    Unique assets a note uses: ![[file]] embeds plus plain [[file.jpg]]
+    links (how visual memories point at their full-size image).
+    """
+    targets = {match.group(1).strip() for match in EMBED_PATTERN.finditer(content)}
+    targets.update(match.group(1).strip() for match in ASSET_LINK_PATTERN.finditer(content))
+    return sorted(targets)
+
+
+class AssetStore:
+    """
+    Blobs are named by the SHA-256 of their bytes, so identical images are
+    stored once no matter how many memory nodes embed them. The reference
+    table (asset -> concepts) is kept by scanning ![[embeds]] whenever a
+    concept is indexed, which also catches notes edited in Obsidian.
+    """
+
+    def __init__(self, assets_path, index_path, compact_every=500, stats=None):
+        self.assets_path = assets_path
+        self.stats = stats      # soul_stats.CartridgeStats, if any
+        self.store = JournaledStore(index_path, "assets", compact_every)
+        self.lock = threading.RLock()
+
+        self.doc_assets = {}    # concept -> [embedded asset names]
+        self.refs = {}          # asset name -> set of concepts
+
+        self.loaded = self._load()
+
+    def _load(self):
+        snapshot, ops = self.store.load()
+        if snapshot is None and not ops:
+            return False
+        if snapshot:
+            for doc_id, assets in snapshot.get("docs", {}).items():
+                self._set(doc_id, assets)
+        for op in ops:
+            self._set(op["doc"], op.get("assets"))
+        return True
+
+    def _set(self, doc_id, assets):
+        for asset in self.doc_assets.pop(doc_id, []):
+            docs = self.refs.get(asset)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self.refs[asset]
+        if assets is None:
+            return
+        self.doc_assets[doc_id] = assets
+        for asset in assets:
+            self.refs.setdefault(asset, set()).add(doc_id)
+
+    def _log(self, doc_id, assets):
+        with self.lock:
+            self._set(doc_id, assets)
+            if self.store.append({"doc": doc_id, "assets": assets}):
+                self.save()
+
+    def put(self, data, ext=None):
+        """
+        Stores bytes under their content hash (no-op if already present).
+        Returns: asset file name, e.g. "3f2a...c1.png"
+        """
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        filename = f"{digest}.{ext or guess_extension(data)}"
+        asset_path = self.assets_path / filename
+
+        if not asset_path.exists():
+            tmp_path = asset_path.with_name(f".{filename}.tmp")
+            with open_creating(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, asset_path)
+            if self.stats is not None:
+                self.stats.record("assets", 1, len(data))
+        return filename
+
+    def references(self, asset_name):
+        """Concepts embedding an asset."""
+        with self.lock:
+            return sorted(self.refs.get(asset_name, ()))
+
+    def unreferenced(self):
+        """Files in assets/ that no concept embeds."""
+        if not self.assets_path.exists():
+            return []
+        with self.lock:
+            return sorted(path.name for path in self.assets_path.iterdir()
+                          if path.is_file() and not path.name.startswith(".")
+                          and path.name not in self.refs)
+
+    def usage(self):
+        """Dict asset name -> (bytes, modified epoch seconds) for every file in assets/."""
+        sizes = {}
+        if not self.assets_path.exists():
+            return sizes
+        for path in self.assets_path.iterdir():
+            if path.is_file() and not path.name.startswith("."):
+                stat = path.stat()
+                sizes[path.name] = (stat.st_size, stat.st_mtime)
+        return sizes
+
+    def delete(self, asset_name):
+        """
+        Deletes an asset file unless a concept still embeds it.
+        Returns: bytes freed
+        """
+        with self.lock:
+            if self.refs.get(asset_name):
+                return 0
+            asset_path = self.assets_path / asset_name
+            try:
+                size = asset_path.stat().st_size
+                asset_path.unlink()
+            except FileNotFoundError:
+                return 0
+            if self.stats is not None:
+                self.stats.record("assets", -1, -size)
+            return size
+
+    # --- Secondary index protocol (see ObsidianBrain) ---
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_assets
+
+    def names(self):
+        with self.lock:
+            return list(self.doc_assets)
+
+    def add_document(self, doc_id, content, analysis=None):
+        assets = extract_embeds(content)
+        if self.doc_assets.get(doc_id) != assets:
+            self._log(doc_id, assets)
+
+    def remove_document(self, doc_id):
+        if doc_id in self.doc_assets:
+            self._log(doc_id, None)
+
+    def save(self):
+        with self.lock:
+            self.store.write_snapshot({
+                "version": 1,
+                "docs": self.doc_assets
+            })
@@ -0,0 +1,129 @@
+"""
+Concept Cache - Riley v2.0
+Bounded LRU cache of concept file contents for the Obsidian Brain.
+"""
+import threading
+from collections import OrderedDict
+
+
+def parse_frontmatter(content):
+    """
+    Parses the YAML-ish block learn() writes at the top of a concept:
+
+        ---
+        created: 2025-01-01 12:00:00
+        tags: [concept, vision]
+        ---
+
+    Returns: dict (empty if the note has no frontmatter)
+    """
+    if not content.startswith("---\n"):
+        return {}
+    end = content.find("\n---", 4)
+    if end == -1:
+        return {}
+
+    meta = {}
+    for line in content[4:end].splitlines():
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            value = [item.strip() for item in value[1:-1].split(",") if item.strip()]
+        meta[key.strip()] = value
+    return meta
+
+
+class ConceptCache:
+    """
+    LRU cache bounded by total bytes of cached content.
+
+    Every lookup stats the file and only trusts the cached copy if
+    (mtime, size) still match, so edits synced from another device or made
+    in Obsidian are picked up on the next read.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()   # path -> (stamp, content, frontmatter, size)
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _store(self, path, stamp, content):
+        cost = len(content.encode('utf-8'))
+        self._discard(path)
+        if cost > self.max_bytes:
+            return
+        self.entries[path] = (stamp, content, parse_frontmatter(content), cost)
+        self.bytes += cost
+        while self.bytes > self.max_bytes:
+            old_path, entry = self.entries.popitem(last=False)
+            self.bytes -= entry[3]
+            self.evictions += 1
+
+    def _discard(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.bytes -= entry[3]
+
+    def _lookup(self, path):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            with self.lock:
+                self._discard(path)
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        with self.lock:
+            self._store(path, stamp, content)
+        return (stamp, content, parse_frontmatter(content), None)
+
+    def get(self, path):
+        """Returns the file content, or None if it doesn't exist."""
+        entry = self._lookup(path)
+        return entry[1] if entry else None
+
+    def get_frontmatter(self, path):
+        """Returns the parsed frontmatter dict, or None if the file doesn't exist."""
+        entry = self._lookup(path)
+        return dict(entry[2]) if entry else None
+
+    def put(self, path, content):
+        """Write-through: caches content we just wrote to `path`."""
+        stat = path.stat()
+        with self.lock:
+            self._store(path, (stat.st_mtime_ns, stat.st_size), content)
+
+    def invalidate(self, path):
+        with self.lock:
+            self._discard(path)
+
+    def stats(self):
+        """Hit/miss counters for tuning max_bytes."""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0
+            }
@@ -0,0 +1,148 @@
+"""
+Core Knowledge Store - Riley v2.0
+Section-aware access to concepts/Core_Knowledge.md
+"""
+import re
+import threading
+
+
+HEADING_PREFIX = b"## "
+FACT_PATTERN = re.compile(r"^- (?:\[[^\]]*\] )?(?:\*\*(.+?):\*\* )?(.*)$")
+
+
+def parse_sections(data):
+    """
+    Parses Core_Knowledge.md bytes.
+    Returns: tuple (category -> byte offset where its next fact goes,
+                    category -> [fact text])
+    """
+    sections = {}
+    facts = {}
+    section = None
+    offset = 0
+
+    for line in data.splitlines(keepends=True):
+        offset += len(line)
+        if line.startswith(HEADING_PREFIX):
+            section = line[len(HEADING_PREFIX):].decode('utf-8', errors='replace').strip()
+            sections[section] = offset
+            facts.setdefault(section, [])
+            continue
+        if not line.strip():
+            continue
+
+        if section is not None:
+            sections[section] = offset
+        match = FACT_PATTERN.match(line.decode('utf-8', errors='replace').rstrip("\r\n"))
+        if not match:
+            continue
+        tag, text = match.groups()
+        # Facts appended by older versions landed at the end of the file,
+        # so their **Category:** tag is what says where they belong
+        category = tag or section
+        if category is not None:
+            facts.setdefault(category, []).append(text)
+
+    return sections, facts
+
+
+def plan_fact(data, sections, category, fact, timestamp):
+    """
+    Works out where "- [timestamp] **category:** fact" goes: the end of its
+    section, or a new section (and file header) at the end.
+    Returns: tuple (byte position, bytes to insert there)
+    """
+    entry = f"- [{timestamp}] **{category}:** {fact}\n".encode('utf-8')
+
+    if category in sections:
+        position = sections[category]
+        if position and not data[:position].endswith(b"\n"):
+            entry = b"\n" + entry
+        return position, entry
+
+    if not data:
+        prefix = b"# Core Knowledge\n\n"
+    elif data.endswith(b"\n\n"):
+        prefix = b""
+    elif data.endswith(b"\n"):
+        prefix = b"\n"
+    else:
+        prefix = b"\n\n"
+    return len(data), prefix + f"## {category}\n".encode('utf-8') + entry
+
+
+class CoreKnowledge:
+    """
+    Keeps a parsed map of the `## Category` sections in Core_Knowledge.md.
+
+    The parse is cached and only redone when the file's (mtime, size)
+    changes, e.g. after an edit in Obsidian or on another device. New facts
+    are spliced in under their heading: only the bytes after the insertion
+    point are rewritten, never re-read.
+    """
+
+    def __init__(self, core_file):
+        self.core_file = core_file
+        self.lock = threading.RLock()
+
+        self.stamp = None       # (mtime_ns, size) the cache was built from
+        self.data = b""
+        self.sections = {}      # category -> byte offset where the next fact goes
+        self.facts = {}         # category -> [fact text]
+
+    def _refresh(self):
+        try:
+            stat = self.core_file.stat()
+        except FileNotFoundError:
+            self.stamp, self.data = None, b""
+            self._parse()
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self.stamp:
+            return
+
+        with open(self.core_file, 'rb') as f:
+            self.data = f.read()
+        self.stamp = stamp
+        self._parse()
+
+    def _parse(self):
+        self.sections, self.facts = parse_sections(self.data)
+
+    @property
+    def text(self):
+        """Current file content (from cache)."""
+        with self.lock:
+            self._refresh()
+            return self.data.decode('utf-8', errors='replace')
+
+    def categories(self):
+        """Section headings, in file order."""
+        with self.lock:
+            self._refresh()
+            return list(self.sections)
+
+    def get_facts(self, category):
+        """Facts filed under a category, oldest first."""
+        with self.lock:
+            self._refresh()
+            return list(self.facts.get(category, []))
+
+    def add_fact(self, category, fact, timestamp):
+        """
+        Inserts "- [timestamp] **category:** fact" at the end of its section,
+        creating the section (and the file) if needed.
+        """
+        with self.lock:
+            self._refresh()
+            position, entry = plan_fact(self.data, self.sections, category, fact, timestamp)
+            tail = self.data[position:]
+            with open(self.core_file, 'r+b' if self.data else 'wb') as f:
+                f.seek(position)
+                f.write(entry + tail)
+
+            self.data = self.data[:position] + entry + tail
+            stat = self.core_file.stat()
+            self.stamp = (stat.st_mtime_ns, stat.st_size)
+            self._parse()
+            return self.data.decode('utf-8', errors='replace')
@@ -0,0 +1,162 @@
+"""
+Near-Duplicate Detection - Riley v2.0
+MinHash signatures + LSH banding so learn() can spot "Python Optimization"
+vs "Python optimisation techniques" without comparing against every note.
+"""
+import random
+import re
+import threading
+import zlib
+
+from memory_index import JournaledStore, tokenize
+
+
+NUM_PERM = 64
+BANDS = 16                      # 16 bands x 4 rows: ~50% similarity to collide
+ROWS = NUM_PERM // BANDS
+DUPLICATE_THRESHOLD = 0.5      # related enough to link
+MERGE_THRESHOLD = 0.8          # similar enough to fold into one note
+_PRIME = (1 << 61) - 1
+
+_rng = random.Random(1337)      # fixed seed: signatures must match across devices
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_FRONTMATTER = re.compile(r"\A---\n.*?\n---\n", re.DOTALL)
+_RELATED = re.compile(r"\n## Related Concepts\n(?:- \[\[.*?\]\]\n?)*", re.DOTALL)
+
+
+def signature_text(doc_id, content):
+    """Title plus body, minus frontmatter and the Related Concepts list."""
+    body = _RELATED.sub("\n", _FRONTMATTER.sub("", content))
+    return f"{doc_id.replace('_', ' ')}\n{body}"
+
+
+def shingles(text):
+    """Character 3-grams over the normalized word stream."""
+    stream = " ".join(tokenize(text))
+    if len(stream) < 3:
+        return {stream} if stream else set()
+    return {stream[i:i + 3] for i in range(len(stream) - 2)}
+
+
+def minhash(text):
+    """64-value MinHash signature of the text's shingle set."""
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text)]
+    if not hashes:
+        return [_PRIME] * NUM_PERM
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def document_signature(doc_id, content):
+    """MinHash signature of a concept (pure; rebuilds run it in worker processes)."""
+    return minhash(signature_text(doc_id, content))
+
+
+class MinHashIndex:
+    """
+    Signatures per concept plus LSH band buckets. A lookup only compares
+    against concepts sharing at least one band, not the whole vault.
+    """
+
+    analyzer = staticmethod(document_signature)
+
+    def __init__(self, index_path, compact_every=500):
+        self.store = JournaledStore(index_path, "minhash", compact_every)
+        self.lock = threading.RLock()
+
+        self.signatures = {}    # concept -> signature
+        self.buckets = {}       # (band, band hash) -> set of concepts
+
+        self.loaded = self._load()
+
+    def _load(self):
+        snapshot, ops = self.store.load()
+        if snapshot is None and not ops:
+            return False
+        if snapshot:
+            for doc_id, signature in snapshot.get("signatures", {}).items():
+                self._put(doc_id, signature)
+        for op in ops:
+            if op["op"] == "put":
+                self._put(op["doc"], op["sig"])
+            elif op["op"] == "del":
+                self._drop(op["doc"])
+        return True
+
+    @staticmethod
+    def _bands(signature):
+        for band in range(BANDS):
+            rows = signature[band * ROWS:(band + 1) * ROWS]
+            yield band, hash(tuple(rows))
+
+    def _put(self, doc_id, signature):
+        self._drop(doc_id)
+        self.signatures[doc_id] = signature
+        for key in self._bands(signature):
+            self.buckets.setdefault(key, set()).add(doc_id)
+
+    def _drop(self, doc_id):
+        signature = self.signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        for key in self._bands(signature):
+            docs = self.buckets.get(key)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self.buckets[key]
+
+    def _log(self, op):
+        if self.store.append(op):
+            self.save()
+
+    # --- Secondary index protocol (see ObsidianBrain) ---
+
+    def __contains__(self, doc_id):
+        return doc_id in self.signatures
+
+    def names(self):
+        with self.lock:
+            return list(self.signatures)
+
+    def add_document(self, doc_id, content, analysis=None):
+        signature = analysis or document_signature(doc_id, content)
+        with self.lock:
+            if self.signatures.get(doc_id) == signature:
+                return
+            self._put(doc_id, signature)
+            self._log({"op": "put", "doc": doc_id, "sig": signature})
+
+    def remove_document(self, doc_id):
+        with self.lock:
+            if doc_id in self.signatures:
+                self._drop(doc_id)
+                self._log({"op": "del", "doc": doc_id})
+
+    def near_duplicates(self, doc_id, content, threshold=DUPLICATE_THRESHOLD):
+        """
+        Concepts whose estimated similarity to this one is >= threshold.
+        Returns: list of (concept name, similarity), most similar first
+        """
+        signature = minhash(signature_text(doc_id, content))
+        with self.lock:
+            candidates = set()
+            for key in self._bands(signature):
+                candidates |= self.buckets.get(key, set())
+            candidates.discard(doc_id)
+
+            scored = [(name, similarity(signature, self.signatures[name])) for name in candidates]
+        scored = [(name, score) for name, score in scored if score >= threshold]
+        return sorted(scored, key=lambda item: (-item[1], item[0]))
+
+    def save(self):
+        with self.lock:
+            self.store.write_snapshot({
+                "version": 1,
+                "signatures": self.signatures
+            })
@@ -0,0 +1,261 @@
+"""
+Graph Index - Riley v2.0
+Adjacency and backlink index over the knowledge graph: [[wikilinks]] inside
+concepts plus the typed edges in Relationship_Graph.md.
+"""
+import re
+import threading
+from collections import deque
+
+from memory_index import JournaledStore
+
+
+WIKILINK_PATTERN = re.compile(r"(?<!!)\[\[([^\[\]]+?)\]\]")
+RELATION_PATTERN = re.compile(r"^- \[\[(.+?)\]\] -- \*(.+?)\* --> \[\[(.+?)\]\]\s*$")
+
+LINK_RELATION = "links_to"
+
+
+def node_name(target):
+    """
+    Normalizes a wikilink target to the concept file stem it points at
+    ("Python|the language" and "Python#History" both mean Python).
+    """
+    target = target.split("|", 1)[0].split("#", 1)[0].strip()
+    return re.sub(r'[<>:"/\\|?*]', '_', target)
+
+
+def extract_links(content):
+    """Unique [[wikilink]] targets in a concept, in order. Embeds (![[...]]) are skipped."""
+    seen = {}
+    for match in WIKILINK_PATTERN.finditer(content):
+        target = node_name(match.group(1))
+        if target:
+            seen.setdefault(target, None)
+    return list(seen)
+
+
+class GraphIndex:
+    """
+    Outgoing and incoming adjacency maps for the knowledge graph.
+
+    Concept links are replaced whenever a concept is re-indexed. Relationship
+    edges are append-only, so only the new tail of Relationship_Graph.md is
+    ever parsed (tracked by byte offset).
+    """
+
+    def __init__(self, index_path, compact_every=500):
+        self.store = JournaledStore(index_path, "graph", compact_every)
+        self.lock = threading.RLock()
+
+        self.links = {}        # concept -> [link targets]
+        self.relations = []    # [source, relation, target]
+        self.rel_offset = 0
+        self.out_edges = {}    # node -> {neighbor: set of relations}
+        self.in_edges = {}     # node -> {neighbor: set of relations}
+
+        self.loaded = self._load()
+
+    def _load(self):
+        snapshot, ops = self.store.load()
+        if snapshot is None and not ops:
+            return False
+
+        if snapshot:
+            for doc_id, targets in snapshot.get("links", {}).items():
+                self._set_links(doc_id, targets)
+            for source, relation, target in snapshot.get("relations", []):
+                self._add_edge(source, relation, target)
+                self.relations.append([source, relation, target])
+            self.rel_offset = snapshot.get("rel_offset", 0)
+
+        for op in ops:
+            self._apply(op)
+        return True
+
+    def _apply(self, op):
+        if op["op"] == "links":
+            self._set_links(op["doc"], op["targets"])
+        elif op["op"] == "del":
+            self._set_links(op["doc"], None)
+        elif op["op"] == "rel":
+            for source, relation, target in op["edges"]:
+                self._add_edge(source, relation, target)
+                self.relations.append([source, relation, target])
+            self.rel_offset = op["offset"]
+        elif op["op"] == "rel_reset":
+            for source, relation, target in self.relations:
+                self._remove_edge(source, relation, target)
+            self.relations = []
+            self.rel_offset = 0
+
+    def _add_edge(self, source, relation, target):
+        self.out_edges.setdefault(source, {}).setdefault(target, set()).add(relation)
+        self.in_edges.setdefault(target, {}).setdefault(source, set()).add(relation)
+
+    def _remove_edge(self, source, relation, target):
+        for edges, a, b in ((self.out_edges, source, target), (self.in_edges, target, source)):
+            relations = edges.get(a, {}).get(b)
+            if relations is None:
+                continue
+            relations.discard(relation)
+            if not relations:
+                del edges[a][b]
+                if not edges[a]:
+                    del edges[a]
+
+    def _set_links(self, doc_id, targets):
+        for target in self.links.pop(doc_id, []):
+            self._remove_edge(doc_id, LINK_RELATION, target)
+        if targets is None:
+            return
+        self.links[doc_id] = targets
+        for target in targets:
+            self._add_edge(doc_id, LINK_RELATION, target)
+
+    def _log(self, op):
+        with self.lock:
+            self._apply(op)
+            if self.store.append(op):
+                self.save()
+
+    # --- Secondary index protocol (see ObsidianBrain) ---
+
+    def __contains__(self, doc_id):
+        return doc_id in self.links
+
+    def names(self):
+        with self.lock:
+            return list(self.links)
+
+    def add_document(self, doc_id, content, analysis=None):
+        """Replaces a concept's outgoing [[wikilinks]]."""
+        targets = extract_links(content)
+        if self.links.get(doc_id) == targets:
+            return
+        self._log({"op": "links", "doc": doc_id, "targets": targets})
+
+    def remove_document(self, doc_id):
+        if doc_id in self.links:
+            self._log({"op": "del", "doc": doc_id})
+
+    def sync_relationships(self, rel_file):
+        """
+        Picks up edges appended to Relationship_Graph.md since the last call.
+        Reads only the new bytes; a file that shrank is re-parsed from scratch.
+
+        Returns: number of new edges
+        """
+        if not rel_file.exists():
+            return 0
+
+        with self.lock:
+            size = rel_file.stat().st_size
+            if size == self.rel_offset:
+                return 0
+            if size < self.rel_offset:
+                self._log({"op": "rel_reset"})
+
+            with open(rel_file, 'rb') as f:
+                f.seek(self.rel_offset)
+                tail = f.read()
+
+            # Leave a half-written last line for next time
+            complete = tail.rfind(b"\n") + 1
+            edges = []
+            for line in tail[:complete].decode('utf-8', errors='replace').splitlines():
+                match = RELATION_PATTERN.match(line)
+                if match:
+                    source, relation, target = match.groups()
+                    edges.append([node_name(source), relation, node_name(target)])
+
+            if complete:
+                self.add_relations(edges, self.rel_offset + complete)
+            return len(edges)
+
+    def add_relations(self, edges, offset):
+        """
+        Records typed edges read from a relationship source.
+
+        Args:
+            edges: list of [source, relation, target]
+            offset: How far into the source has now been read (a byte
+                    offset for Relationship_Graph.md, a row id for SQLite)
+        """
+        self._log({"op": "rel", "edges": [list(edge) for edge in edges], "offset": offset})
+
+    # --- Queries: cost is proportional to the edges touched ---
+
+    def _adjacent(self, node, direction):
+        if direction in ("out", "both"):
+            yield from self.out_edges.get(node, {})
+        if direction in ("in", "both"):
+            yield from self.in_edges.get(node, {})
+
+    def neighbors(self, node, direction="out"):
+        """
+        Nodes one edge away.
+        Returns: dict neighbor -> sorted list of relations
+        """
+        with self.lock:
+            result = {}
+            if direction in ("out", "both"):
+                for neighbor, relations in self.out_edges.get(node, {}).items():
+                    result.setdefault(neighbor, set()).update(relations)
+            if direction in ("in", "both"):
+                for neighbor, relations in self.in_edges.get(node, {}).items():
+                    result.setdefault(neighbor, set()).update(relations)
+            return {neighbor: sorted(relations) for neighbor, relations in result.items()}
+
+    def k_hop(self, node, k=2, direction="both"):
+        """
+        Breadth-first neighborhood up to k edges away (node itself excluded).
+        Returns: dict node -> hop distance
+        """
+        with self.lock:
+            distances = {node: 0}
+            frontier = deque([node])
+            while frontier:
+                current = frontier.popleft()
+                if distances[current] == k:
+                    continue
+                for neighbor in self._adjacent(current, direction):
+                    if neighbor not in distances:
+                        distances[neighbor] = distances[current] + 1
+                        frontier.append(neighbor)
+            del distances[node]
+            return distances
+
+    def shortest_path(self, source, target, direction="both"):
+        """
+        Fewest-edges path between two nodes (BFS, stops as soon as the
+        target is reached).
+        Returns: list of nodes from source to target, or None
+        """
+        with self.lock:
+            if source == target:
+                return [source]
+            parents = {source: None}
+            frontier = deque([source])
+            while frontier:
+                current = frontier.popleft()
+                for neighbor in self._adjacent(current, direction):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = current
+                    if neighbor == target:
+                        path = [target]
+                        while parents[path[-1]] is not None:
+                            path.append(parents[path[-1]])
+                        return path[::-1]
+                    frontier.append(neighbor)
+            return None
+
+    def save(self):
+        with self.lock:
+            self.store.write_snapshot({
+                "version": 1,
+                "links": self.links,
+                "relations": self.relations,
+                "rel_offset": self.rel_offset
+            })
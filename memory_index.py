@@ -0,0 +1,368 @@
+"""
+Memory Index - Riley v2.0
+On-disk indexes that keep Obsidian Brain lookups off the full-vault scan path.
+Index files live in the Soul Cartridge under knowledge_graph/.index/
+"""
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# BM25 tuning (standard defaults); title hits count extra
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 2.0
+
+# Partial-word lookups go through an index of the vocabulary's n-grams
+GRAM = 3
+
+
+def tokenize(text):
+    """Splits text into lowercase alphanumeric terms."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def grams(term):
+    """The distinct GRAM-character substrings of a term."""
+    return {term[i:i + GRAM] for i in range(len(term) - GRAM + 1)}
+
+
+def analyze_document(doc_id, text):
+    """
+    Term frequencies, title terms and length of one concept. Pure, so a
+    rebuild can run it in worker processes.
+    """
+    terms = {}
+    for term in tokenize(text):
+        terms[term] = terms.get(term, 0) + 1
+    return {
+        "terms": terms,
+        "title": sorted(set(tokenize(doc_id))),
+        "length": sum(terms.values())
+    }
+
+
+class JournaledStore:
+    """
+    Snapshot + append-only journal persistence for a brain index.
+    Every mutation is one JSON line appended to <name>.log, so an update
+    costs a small append instead of rewriting the whole index. The journal
+    is folded back into <name>.json once it grows past `compact_every` ops.
+    """
+
+    def __init__(self, index_path, name, compact_every=500):
+        self.index_path = Path(index_path)
+        self.snapshot_file = self.index_path / f"{name}.json"
+        self.journal_file = self.index_path / f"{name}.log"
+        self.compact_every = compact_every
+        self.pending = 0
+        self.buffer = None      # ops held back by batch()
+
+    def load(self):
+        """
+        Reads the snapshot and the journal written after it.
+        Returns: tuple (snapshot dict or None, list of journal ops)
+        """
+        snapshot = None
+        ops = []
+
+        if self.snapshot_file.exists():
+            try:
+                with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ [Index] Corrupt snapshot {self.snapshot_file.name}, rebuilding: {e}")
+                return None, []
+
+        if self.journal_file.exists():
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        ops.append(json.loads(line))
+                    except ValueError:
+                        # Torn final line from a crash mid-append
+                        break
+
+        self.pending = len(ops)
+        return snapshot, ops
+
+    def append(self, op):
+        """
+        Appends one op to the journal.
+        Returns: True when the journal is due for compaction
+        """
+        if self.buffer is not None:
+            # Compaction is left to whoever opened the batch
+            self.buffer.append(op)
+            self.pending += 1
+            return False
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(op, separators=(",", ":")) + "\n")
+        self.pending += 1
+        return self.pending >= self.compact_every
+
+    @contextmanager
+    def batch(self):
+        """Buffers the ops appended inside the block and writes them in one go."""
+        self.buffer = []
+        try:
+            yield self
+        finally:
+            ops, self.buffer = self.buffer, None
+            if ops:
+                self.index_path.mkdir(parents=True, exist_ok=True)
+                with open(self.journal_file, 'a', encoding='utf-8') as f:
+                    f.write("".join(json.dumps(op, separators=(",", ":")) + "\n" for op in ops))
+
+    def write_snapshot(self, state):
+        """Atomically replaces the snapshot and truncates the journal."""
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.snapshot_file.with_suffix(".json.tmp")
+        # dumps() uses the C encoder; streaming dump() would not
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(state, separators=(",", ":")))
+        os.replace(tmp_file, self.snapshot_file)
+
+        if self.journal_file.exists():
+            self.journal_file.unlink()
+        self.pending = 0
+
+
+@contextmanager
+def batched(indexes, compact=True):
+    """
+    Groups updates to several journaled indexes (anything with a `store`
+    and save()). Each index's ops are appended in a single write when the
+    block ends, and an index whose journal is then due is compacted once,
+    rather than every `compact_every` ops along the way.
+
+    Args:
+        compact: False leaves compaction to the caller (e.g. a rebuild
+                 that saves every index once at the end)
+    """
+    with ExitStack() as stack:
+        for index in indexes:
+            stack.enter_context(index.store.batch())
+        yield
+    if not compact:
+        return
+    for index in indexes:
+        if index.store.pending >= index.store.compact_every:
+            index.save()
+
+
+class InvertedIndex:
+    """
+    Term -> concept postings for the concepts/ folder.
+
+    The forward map (concept -> term frequencies) is what gets persisted;
+    postings are rebuilt from it in memory on load, so the on-disk format
+    stays a single record per concept.
+    """
+
+    def __init__(self, index_path, compact_every=500):
+        self.store = JournaledStore(index_path, "inverted", compact_every)
+        self.lock = threading.RLock()
+
+        self.docs = {}       # concept -> {"terms", "title", "length", "mtime", "size"}
+        self.postings = {}   # term -> set of concepts
+        self.grams = {}      # n-gram -> set of terms, for partial-word lookups
+        self.total_length = 0
+        self.dir_mtime = None
+
+        self.loaded = self._load()
+
+    def _load(self):
+        snapshot, ops = self.store.load()
+        if snapshot is None and not ops:
+            return False
+
+        if snapshot:
+            self.dir_mtime = snapshot.get("dir_mtime")
+            for doc_id, record in snapshot.get("docs", {}).items():
+                self._put(doc_id, record)
+
+        for op in ops:
+            self._apply(op)
+        return True
+
+    def _apply(self, op):
+        if op["op"] == "put":
+            self._put(op["doc"], op["record"])
+        elif op["op"] == "del":
+            self._drop(op["doc"])
+        if "dir_mtime" in op:
+            self.dir_mtime = op["dir_mtime"]
+
+    def _put(self, doc_id, record):
+        self._drop(doc_id)
+        self.docs[doc_id] = record
+        self.total_length += record["length"]
+        for term in list(record["terms"]) + record["title"]:
+            docs = self.postings.get(term)
+            if docs is None:
+                docs = self.postings[term] = set()
+                self._add_term(term)
+            docs.add(doc_id)
+
+    def _drop(self, doc_id):
+        record = self.docs.pop(doc_id, None)
+        if record is None:
+            return
+        self.total_length -= record["length"]
+        for term in list(record["terms"]) + record["title"]:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self.postings[term]
+                    self._remove_term(term)
+
+    def _add_term(self, term):
+        for gram in grams(term):
+            self.grams.setdefault(gram, set()).add(term)
+
+    def _remove_term(self, term):
+        for gram in grams(term):
+            terms = self.grams.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self.grams[gram]
+
+    def _terms_containing(self, query_term):
+        """
+        Vocabulary terms that contain query_term. Terms of GRAM or more
+        characters are looked up through the n-gram index (cost follows the
+        rarest n-gram, not the vocabulary); shorter ones hit so much of the
+        vocabulary that a scan is as cheap.
+        """
+        if len(query_term) < GRAM:
+            return [term for term in self.postings if query_term in term]
+
+        term_sets = []
+        for gram in grams(query_term):
+            terms = self.grams.get(gram)
+            if not terms:
+                return []
+            term_sets.append(terms)
+        term_sets.sort(key=len)
+        found = term_sets[0].intersection(*term_sets[1:])
+        return [term for term in found if query_term in term]
+
+    def _log(self, op):
+        if self.store.append(op):
+            self.save()
+
+    def add_document(self, doc_id, text, mtime=None, size=None, dir_mtime=None, analysis=None):
+        """
+        Indexes (or re-indexes) one concept.
+
+        Args:
+            doc_id: Concept name (file stem)
+            text: Full file content
+            mtime, size: File stat used to detect external edits
+            dir_mtime: concepts/ mtime after the write, if known
+            analysis: analyze_document() result, if already computed
+        """
+        record = dict(analysis or analyze_document(doc_id, text))
+        record["mtime"] = mtime
+        record["size"] = size
+        op = {"op": "put", "doc": doc_id, "record": record}
+        if dir_mtime is not None:
+            op["dir_mtime"] = dir_mtime
+
+        with self.lock:
+            self._apply(op)
+            self._log(op)
+
+    def remove_document(self, doc_id):
+        """Removes a concept from the index."""
+        with self.lock:
+            if doc_id not in self.docs:
+                return
+            op = {"op": "del", "doc": doc_id}
+            self._apply(op)
+            self._log(op)
+
+    def candidates(self, query):
+        """
+        Concepts that may contain `query` as a substring.
+
+        Each query term must appear inside some term of the concept (so
+        partial words like "pyth" still hit "python"): the exact term's
+        postings, plus those of longer terms found through the n-gram index.
+
+        Returns: set of concept names, or None if the query has no terms
+        """
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return None
+
+        with self.lock:
+            result = None
+            for query_term in sorted(query_terms, key=len, reverse=True):
+                hits = set(self.postings.get(query_term, ()))
+                for term in self._terms_containing(query_term):
+                    hits |= self.postings[term]
+                result = hits if result is None else result & hits
+                if not result:
+                    return set()
+            return result
+
+    def rank(self, query, limit=10):
+        """
+        BM25 top-k over concept bodies and titles.
+
+        Scores come entirely from the stored term frequencies and document
+        lengths, so ranking never touches the concept files.
+
+        Returns: list of (concept name, score), best first
+        """
+        query_terms = set(tokenize(query))
+        with self.lock:
+            n_docs = len(self.docs)
+            if not query_terms or not n_docs:
+                return []
+            avg_length = (self.total_length / n_docs) or 1.0
+
+            scores = {}
+            for term in query_terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                df = len(docs)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id in docs:
+                    record = self.docs[doc_id]
+                    tf = record["terms"].get(term, 0)
+                    if term in record["title"]:
+                        tf += TITLE_WEIGHT
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * record["length"] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def set_dir_mtime(self, dir_mtime):
+        """Records the concepts/ mtime the index is known to be in sync with."""
+        with self.lock:
+            if self.dir_mtime != dir_mtime:
+                self.dir_mtime = dir_mtime
+                self._log({"op": "meta", "dir_mtime": dir_mtime})
+
+    def save(self):
+        """Compacts the journal into a fresh snapshot."""
+        with self.lock:
+            self.store.write_snapshot({
+                "version": 1,
+                "dir_mtime": self.dir_mtime,
+                "docs": self.docs
+            })
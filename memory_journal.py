@@ -0,0 +1,411 @@
+"""
+Daily Journal - Riley v2.0
+Writers for the knowledge_graph/logs/YYYY-MM-DD.md daily logs.
+"""
+import gzip
+import json
+import lzma
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+
+from soul_durability import open_creating
+
+
+ENTRY_PATTERN = re.compile(rb"^\*\*(\d\d:\d\d:\d\d)\*\* - ", re.MULTILINE)
+HEADER_PATTERN = re.compile(rb"^# Daily Log: ", re.MULTILINE)
+SOURCE_PATTERN = re.compile(r"^\[([^\]]+)\] ")
+
+
+ARCHIVE_CODECS = {
+    "gzip": (".md.gz", gzip.compress, gzip.decompress),
+    "lzma": (".md.xz", lzma.compress, lzma.decompress),
+}
+
+
+def scan_entries(data, base=0):
+    """
+    Finds the "**HH:MM:SS** - " entries in a chunk of log bytes. An entry
+    ends at the next entry or "# Daily Log:" header line, whichever comes
+    first.
+    Returns: list of (HH:MM:SS, start, end) with offsets shifted by `base`
+    """
+    starts = [(m.group(1).decode(), base + m.start()) for m in ENTRY_PATTERN.finditer(data)]
+    headers = [base + m.start() for m in HEADER_PATTERN.finditer(data)]
+    spans = []
+    for i, (clock, start) in enumerate(starts):
+        end = starts[i + 1][1] if i + 1 < len(starts) else base + len(data)
+        end = min([end] + [header for header in headers if start < header < end])
+        spans.append((clock, start, end))
+    return spans
+
+
+def log_file_for(logs_path, when):
+    """Path of the daily log an entry stamped `when` belongs to."""
+    return logs_path / f"{when.strftime('%Y-%m-%d')}.md"
+
+
+def append_entries(logs_path, entries, log_index=None):
+    """
+    Appends (datetime, text) entries to their daily logs, creating each
+    file with its header on first use. Entries are grouped per day so a
+    batch costs one open/write per file, and a batch that straddles
+    midnight lands in the right files. When a LogIndex is given, the byte
+    span of every entry is recorded in its sidecar.
+
+    Returns: dict log file -> (bytes written, True if the file is new)
+    """
+    by_day = {}
+    written = {}
+    for when, text in entries:
+        by_day.setdefault(log_file_for(logs_path, when), []).append(
+            (when.strftime('%H:%M:%S'), f"**{when.strftime('%H:%M:%S')}** - {text}\n\n".encode('utf-8'))
+        )
+
+    for log_file, lines in by_day.items():
+        with open_creating(log_file, 'ab') as f:
+            offset = start = f.tell()
+            if offset == 0:
+                header = f"# Daily Log: {log_file.stem}\n\n".encode('utf-8')
+                f.write(header)
+                offset = len(header)
+            spans = []
+            for clock, data in lines:
+                spans.append((clock, offset, offset + len(data)))
+                offset += len(data)
+            f.write(b"".join(data for clock, data in lines))
+            written[log_file] = (offset - start, start == 0)
+
+        if log_index is not None:
+            log_index.record(log_file, spans)
+    return written
+
+
+class LogIndex:
+    """
+    Byte-offset sidecars for the daily logs.
+
+    .index/logs/YYYY-MM-DD.idx holds one "HH:MM:SS<TAB>start<TAB>end" line per
+    entry, so a time-range query seeks straight to its slice of the log. A
+    sidecar that doesn't reach the end of its log (edited or synced from
+    another device) is caught up by scanning only the unindexed tail.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        self.lock = threading.Lock()
+
+    def _sidecar(self, log_file):
+        return self.index_dir / f"{log_file.stem}.idx"
+
+    def record(self, log_file, spans):
+        """Appends entry spans written by append_entries()."""
+        with self.lock:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._sidecar(log_file), 'a', encoding='utf-8') as f:
+                f.write("".join(f"{clock}\t{start}\t{end}\n" for clock, start, end in spans))
+
+    def _read(self, sidecar):
+        spans = []
+        if sidecar.exists():
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) == 3:
+                        spans.append((parts[0], int(parts[1]), int(parts[2])))
+        return spans
+
+    def entries(self, log_file):
+        """
+        Validated (HH:MM:SS, start, end) spans for one daily log.
+        Returns: list ordered by file position
+        """
+        with self.lock:
+            sidecar = self._sidecar(log_file)
+            spans = self._read(sidecar)
+            size = log_file.stat().st_size
+            covered = spans[-1][2] if spans else 0
+            if covered == size:
+                return spans
+
+            if covered > size:
+                # Log was rewritten - start over
+                spans, covered = [], 0
+                if sidecar.exists():
+                    sidecar.unlink()
+
+            with open(log_file, 'rb') as f:
+                f.seek(covered)
+                tail = f.read()
+
+            new_spans = scan_entries(tail, covered)
+            if spans and new_spans and new_spans[0][1] > covered:
+                # Text appended to the last indexed entry - extend it
+                spans[-1] = (spans[-1][0], spans[-1][1], new_spans[0][1])
+            elif spans and not new_spans:
+                spans[-1] = (spans[-1][0], spans[-1][1], covered + len(tail))
+
+            spans += new_spans
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with open(sidecar, 'w', encoding='utf-8') as f:
+                f.write("".join(f"{clock}\t{start}\t{end}\n" for clock, start, end in spans))
+            return spans
+
+
+class LogArchive:
+    """
+    Cold tier for old daily logs: logs/archive/YYYY-MM.md.gz (or .md.xz).
+
+    Each day is compressed as its own member and appended to its month's
+    archive, so the file stays a normal multi-member gzip/xz stream (zcat
+    prints the month) while YYYY-MM.json records every day's byte range
+    and a single day can be read back without inflating the rest.
+    """
+
+    def __init__(self, logs_path, codec="gzip"):
+        self.archive_path = logs_path / "archive"
+        self.codec = codec
+        self.lock = threading.Lock()
+        self._indexes = {}      # month -> member index (cached)
+
+    def _index_file(self, month):
+        return self.archive_path / f"{month}.json"
+
+    def _load_index(self, month):
+        if month not in self._indexes:
+            index_file = self._index_file(month)
+            index = {"codec": self.codec, "days": {}}
+            if index_file.exists():
+                with open(index_file, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            self._indexes[month] = index
+        return self._indexes[month]
+
+    def _archive_file(self, month, codec):
+        return self.archive_path / f"{month}{ARCHIVE_CODECS[codec][0]}"
+
+    def has_day(self, day):
+        """True if `day` (datetime.date) has archived entries."""
+        with self.lock:
+            return day.isoformat() in self._load_index(day.strftime("%Y-%m"))["days"]
+
+    def read_members(self, day):
+        """
+        Returns the archived log bytes for a day as one chunk per member
+        (a day archived again after late entries has several, each with
+        its own header), or an empty list.
+        """
+        month = day.strftime("%Y-%m")
+        with self.lock:
+            index = self._load_index(month)
+            members = index["days"].get(day.isoformat())
+            if not members:
+                return []
+            decompress = ARCHIVE_CODECS[index["codec"]][2]
+            chunks = []
+            with open(self._archive_file(month, index["codec"]), 'rb') as f:
+                for offset, length in members:
+                    f.seek(offset)
+                    chunks.append(decompress(f.read(length)))
+            return chunks
+
+    def read_day(self, day):
+        """Returns the archived log bytes for a day, or None."""
+        return b"".join(self.read_members(day)) or None
+
+    def days(self):
+        """All archived days, oldest first."""
+        with self.lock:
+            result = []
+            for index_file in sorted(self.archive_path.glob("*.json")):
+                result += sorted(self._load_index(index_file.stem)["days"])
+            return result
+
+    def months(self):
+        """Dict month (YYYY-MM) -> bytes on disk (archive + member index)."""
+        with self.lock:
+            sizes = {}
+            if self.archive_path.exists():
+                for path in self.archive_path.iterdir():
+                    month = path.name[:7]
+                    if path.is_file() and re.fullmatch(r"\d{4}-\d{2}", month):
+                        sizes[month] = sizes.get(month, 0) + path.stat().st_size
+            return sizes
+
+    def drop_month(self, month):
+        """
+        Deletes a month's archive for good.
+        Returns: bytes freed
+        """
+        with self.lock:
+            self._indexes.pop(month, None)
+            freed = 0
+            for path in self.archive_path.glob(f"{month}.*"):
+                freed += path.stat().st_size
+                path.unlink()
+            return freed
+
+    def archive(self, log_file):
+        """
+        Moves one daily log into its month's archive. The member is
+        written and indexed before the original is deleted, so a crash
+        can only leave an unindexed tail that the next append overwrites.
+        """
+        day = date.fromisoformat(log_file.stem)
+        month = day.strftime("%Y-%m")
+        with open(log_file, 'rb') as f:
+            data = f.read()
+
+        with self.lock:
+            self.archive_path.mkdir(parents=True, exist_ok=True)
+            index = self._load_index(month)
+            compress = ARCHIVE_CODECS[index["codec"]][1]
+            member = compress(data)
+            archive_file = self._archive_file(month, index["codec"])
+
+            end = max((offset + length for members in index["days"].values()
+                       for offset, length in members), default=0)
+            with open(archive_file, 'ab') as f:
+                f.truncate(end)
+                f.seek(end)
+                f.write(member)
+                f.flush()
+                os.fsync(f.fileno())
+
+            index["days"].setdefault(day.isoformat(), []).append([end, len(member)])
+            tmp_file = self._index_file(month).with_suffix(".json.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=1)
+            os.replace(tmp_file, self._index_file(month))
+
+        log_file.unlink()
+        return len(data), len(member)
+
+
+def query_logs(logs_path, log_index, start, end, source=None, archive=None):
+    """
+    Yields (datetime, text) for log entries stamped within [start, end],
+    in time order. Only the byte range holding matching entries is read
+    from each daily log; archived days are inflated one member at a time.
+
+    Args:
+        source: Only entries tagged "[SOURCE] ..." (see log_episode)
+        archive: LogArchive to fall back to for days no longer in logs/
+    """
+    day = start.date()
+    while day <= end.date():
+        log_file = logs_path / f"{day.isoformat()}.md"
+        day_start = datetime.combine(day, datetime.min.time())
+        low = max(start, day_start).strftime('%H:%M:%S')
+        high = min(end, day_start + timedelta(days=1) - timedelta(seconds=1)).strftime('%H:%M:%S')
+
+        # A day can be partly archived and partly live (late sync)
+        sources = []
+        if archive is not None and archive.has_day(day):
+            for data in archive.read_members(day):
+                sources.append((data, 0, [span for span in scan_entries(data) if low <= span[0] <= high]))
+        if log_file.exists():
+            spans = [span for span in log_index.entries(log_file) if low <= span[0] <= high]
+            if spans:
+                first = min(span[1] for span in spans)
+                with open(log_file, 'rb') as f:
+                    f.seek(first)
+                    block = f.read(max(span[2] for span in spans) - first)
+                sources.append((block, first, spans))
+
+        day += timedelta(days=1)
+        entries = []
+        for block, first, spans in sources:
+            entries += read_spans(block, first, spans, day_start, source)
+        if len(sources) > 1:
+            # Late entries may predate ones archived earlier
+            entries.sort(key=lambda entry: entry[0])
+        yield from entries
+
+
+def read_spans(block, first, spans, day_start, source=None):
+    """
+    Decodes log entry spans out of `block` (which starts at file offset
+    `first`). Yields (datetime, text), optionally only for one source tag.
+    """
+    for clock, span_start, span_end in spans:
+        raw = block[span_start - first:span_end - first].decode('utf-8', errors='replace')
+        text = raw.split(" - ", 1)[1].rstrip("\n") if " - " in raw else raw.strip()
+        tag = SOURCE_PATTERN.match(text)
+        if source is not None and (tag is None or tag.group(1) != source):
+            continue
+        hours, minutes, seconds = (int(part) for part in clock.split(":"))
+        yield day_start.replace(hour=hours, minute=minutes, second=seconds), text
+
+
+class DailyLogWriter:
+    """
+    Write-behind (group commit) journal for log_daily().
+
+    Entries are queued in memory and a background thread appends them in
+    batches once `max_batch` entries are waiting or `flush_interval`
+    seconds have passed. Call flush() before reading logs and on shutdown.
+    """
+
+    def __init__(self, storage, max_batch=64, flush_interval=2.0):
+        """
+        Args:
+            storage: Where batches go - anything with append_logs(entries)
+                     and log_location(when), e.g. a memory_storage backend
+        """
+        self.storage = storage
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+
+        self.queue = []
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.running = True
+
+        self.thread = threading.Thread(target=self._run, name="riley-log-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, when, text):
+        """Queues one entry. Returns where it will land (the daily log file)."""
+        with self.cond:
+            self.queue.append((when, text))
+            if len(self.queue) >= self.max_batch:
+                self.cond.notify()
+        return self.storage.log_location(when)
+
+    def flush(self):
+        """Writes every queued entry now."""
+        with self.write_lock:
+            with self.cond:
+                batch, self.queue = self.queue, []
+            if not batch:
+                return
+            try:
+                self.storage.append_logs(batch)
+            except Exception:
+                # Put the batch back so nothing is lost on a transient error
+                with self.cond:
+                    self.queue[:0] = batch
+                raise
+
+    def close(self):
+        """Stops the background thread after a final flush."""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                if self.running and len(self.queue) < self.max_batch:
+                    self.cond.wait(self.flush_interval)
+                running = self.running
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ [Journal] Flush failed, will retry: {e}")
+            if not running:
+                return
@@ -0,0 +1,175 @@
+"""
+Metadata Index - Riley v2.0
+Creation times and tags from concept frontmatter, so "tagged X, created this
+week" is answered without opening a single note.
+"""
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+
+from memory_cache import parse_frontmatter
+from memory_index import JournaledStore
+
+
+def to_timestamp(value, end_of_day=False):
+    """
+    datetime, date, epoch seconds or "YYYY-MM-DD[ HH:MM:SS]" -> epoch seconds.
+    Returns None for anything unparseable.
+
+    Args:
+        end_of_day: A bare date (no time) means the end of that day rather
+                    than its start - for inclusive upper bounds
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if not isinstance(value, date):
+        text = str(value).strip()
+        try:
+            value = date.fromisoformat(text)
+        except ValueError:
+            try:
+                return datetime.fromisoformat(text).timestamp()
+            except ValueError:
+                return None
+    return datetime.combine(value, datetime.max.time() if end_of_day else datetime.min.time()).timestamp()
+
+
+def extract_metadata(content):
+    """(created epoch seconds or None, sorted tags) from a concept's frontmatter."""
+    meta = parse_frontmatter(content)
+    tags = meta.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tags]
+    return to_timestamp(meta.get("created")), sorted({tag.lstrip("#") for tag in tags if tag})
+
+
+class MetadataIndex:
+    """
+    A creation-time array kept sorted (range queries are two bisects) plus
+    tag -> concept postings. Concepts without a `created:` line are only
+    reachable through tags.
+    """
+
+    def __init__(self, index_path, compact_every=500):
+        self.store = JournaledStore(index_path, "metadata", compact_every)
+        self.lock = threading.RLock()
+
+        self.docs = {}          # concept -> [created or None, tags]
+        self.times = []         # sorted (created, concept)
+        self.tags = {}          # tag -> set of concepts
+
+        self.loaded = self._load()
+
+    def _load(self):
+        snapshot, ops = self.store.load()
+        if snapshot is None and not ops:
+            return False
+        if snapshot:
+            docs = snapshot.get("docs", {})
+            for doc_id, (created, tags) in docs.items():
+                self.docs[doc_id] = [created, tags]
+                for tag in tags:
+                    self.tags.setdefault(tag, set()).add(doc_id)
+            self.times = sorted((created, doc_id) for doc_id, (created, tags) in docs.items()
+                                if created is not None)
+        for op in ops:
+            if op["op"] == "put":
+                self._put(op["doc"], op["created"], op["tags"])
+            elif op["op"] == "del":
+                self._drop(op["doc"])
+        return True
+
+    def _put(self, doc_id, created, tags):
+        self._drop(doc_id)
+        self.docs[doc_id] = [created, tags]
+        if created is not None:
+            insort(self.times, (created, doc_id))
+        for tag in tags:
+            self.tags.setdefault(tag, set()).add(doc_id)
+
+    def _drop(self, doc_id):
+        record = self.docs.pop(doc_id, None)
+        if record is None:
+            return
+        created, tags = record
+        if created is not None:
+            position = bisect_left(self.times, (created, doc_id))
+            if position < len(self.times) and self.times[position] == (created, doc_id):
+                del self.times[position]
+        for tag in tags:
+            docs = self.tags.get(tag)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self.tags[tag]
+
+    def _log(self, op):
+        if self.store.append(op):
+            self.save()
+
+    # --- Secondary index protocol (see ObsidianBrain) ---
+
+    def __contains__(self, doc_id):
+        return doc_id in self.docs
+
+    def names(self):
+        with self.lock:
+            return list(self.docs)
+
+    def add_document(self, doc_id, content, analysis=None):
+        created, tags = extract_metadata(content)
+        with self.lock:
+            if self.docs.get(doc_id) == [created, tags]:
+                return
+            self._put(doc_id, created, tags)
+            self._log({"op": "put", "doc": doc_id, "created": created, "tags": tags})
+
+    def remove_document(self, doc_id):
+        with self.lock:
+            if doc_id in self.docs:
+                self._drop(doc_id)
+                self._log({"op": "del", "doc": doc_id})
+
+    def find(self, tags=None, created_after=None, created_before=None):
+        """
+        Concepts carrying every tag in `tags` and created within
+        [created_after, created_before] (both inclusive, either optional).
+
+        Returns: list of concept names, oldest first (undated ones last,
+                 by name)
+        """
+        if isinstance(tags, str):
+            tags = [tags]
+        after, before = to_timestamp(created_after), to_timestamp(created_before, end_of_day=True)
+
+        with self.lock:
+            matches = None
+            # Intersect the shortest posting lists first
+            for tag in sorted((tag.lstrip("#") for tag in tags or []),
+                              key=lambda tag: len(self.tags.get(tag, ()))):
+                docs = self.tags.get(tag, set())
+                matches = set(docs) if matches is None else matches & docs
+                if not matches:
+                    return []
+
+            if after is None and before is None:
+                if matches is None:
+                    matches = set(self.docs)
+                return sorted(matches, key=lambda doc_id: (self.docs[doc_id][0] is None,
+                                                           self.docs[doc_id][0] or 0, doc_id))
+
+            low = 0 if after is None else bisect_left(self.times, (after, ""))
+            high = len(self.times) if before is None else bisect_right(self.times, (before, "\U0010ffff"))
+            return [doc_id for created, doc_id in self.times[low:high]
+                    if matches is None or doc_id in matches]
+
+    def save(self):
+        with self.lock:
+            self.store.write_snapshot({
+                "version": 1,
+                "docs": self.docs
+            })
@@ -0,0 +1,138 @@
+"""
+Index Rebuild - Riley v2.0
+Parallel cold scan for the brain indexes (fresh device, deleted .index/):
+a thread pool reads the notes, a process pool does the CPU-bound analysis
+(tokenizing, MinHash, embeddings) and the main thread applies the results
+chunk by chunk.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from memory_index import batched
+
+
+# Below this many notes, starting worker processes costs more than it saves
+PARALLEL_THRESHOLD = 200
+
+
+def analyze_chunk(analyzers, docs):
+    """
+    Runs every index's analyzer over a chunk of (name, content).
+    Returns: one list of analyses (None where an index has no analyzer) per doc
+    """
+    return [[analyzer(name, content) if analyzer is not None else None for analyzer in analyzers]
+            for name, content in docs]
+
+
+class IndexRebuilder:
+    """
+    Feeds a batch of notes through the indexes in parallel.
+
+    Results are applied in chunks, and each chunk's journal entries are
+    written together before the next one starts, so an interrupted rebuild
+    keeps everything up to the last finished chunk and the next sync only
+    redoes the rest.
+    """
+
+    def __init__(self, workers=None, chunk_size=128, progress=None):
+        """
+        Args:
+            workers: Analysis processes (default: CPU count)
+            chunk_size: Notes per work unit / journal write
+            progress: Callback(done, total); default prints every ~10%
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.progress = progress or self._print_progress
+        self._reported = -1
+
+    def _print_progress(self, done, total):
+        step = done * 10 // total if total else 10
+        if step != self._reported:
+            self._reported = step
+            print(f"🗂️ [Brain] Rebuilding indexes: {done}/{total} ({done * 100 // max(total, 1)}%)")
+
+    def _open_pool(self):
+        if self.workers < 2:
+            return None
+        try:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        except (OSError, NotImplementedError, ImportError) as e:
+            print(f"⚠️ [Brain] No worker processes ({e}), analyzing in-process")
+            return None
+
+    def run(self, items, read, analyzers, apply, journaled):
+        """
+        Args:
+            items: Work items (e.g. file paths)
+            read: item -> (name, content) or None to skip; runs in threads
+            analyzers: Pure functions (name, content) -> analysis, or None
+            apply: Callback(item, name, content, analyses) in this thread
+            journaled: Indexes whose journal writes are grouped per chunk;
+                       the caller must save() them afterwards
+
+        Returns: number of items applied. Items `read` skipped (unreadable
+                 notes) are not counted; their index records stay stale,
+                 so the next sync retries them.
+        """
+        items = list(items)
+        total = len(items)
+        done = 0
+        applied = 0
+        self.progress(0, total)
+
+        executor = self._open_pool()
+        pool = executor
+        pending = deque()
+
+        def read_item(item):
+            result = read(item)
+            return None if result is None else (item, *result)
+
+        def finish():
+            nonlocal pool, applied
+            size, chunk, future = pending.popleft()
+            docs = [(name, content) for item, name, content in chunk]
+            try:
+                results = future.result() if future is not None else analyze_chunk(analyzers, docs)
+            except Exception as e:
+                # Broken pool (killed worker, unpicklable input): finish locally
+                print(f"⚠️ [Brain] Worker failed ({e}), analyzing in-process")
+                pool = None
+                results = analyze_chunk(analyzers, docs)
+            # The caller saves every index once the rebuild is done
+            with batched(journaled, compact=False):
+                for (item, name, content), analyses in zip(chunk, results):
+                    apply(item, name, content, analyses)
+            applied += len(chunk)
+            return size
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(32, self.workers * 4)) as readers:
+                for start in range(0, total, self.chunk_size):
+                    batch = items[start:start + self.chunk_size]
+                    chunk = [entry for entry in readers.map(read_item, batch) if entry is not None]
+                    future = None
+                    if pool is not None:
+                        try:
+                            future = pool.submit(analyze_chunk, analyzers,
+                                                 [(name, content) for item, name, content in chunk])
+                        except Exception as e:
+                            print(f"⚠️ [Brain] Worker pool unavailable ({e}), analyzing in-process")
+                            pool = None
+                    pending.append((len(batch), chunk, future))
+                    # Keep the workers busy without holding the whole vault in memory
+                    while len(pending) > self.workers * 2:
+                        done += finish()
+                        self.progress(done, total)
+                while pending:
+                    done += finish()
+                    self.progress(done, total)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        if applied < done:
+            print(f"⚠️ [Brain] {done - applied} notes could not be read, left for the next sync")
+        return applied
@@ -0,0 +1,177 @@
+"""
+Retention - Riley v2.0
+Disk budgets for the Soul Cartridge. When an area (concepts, logs, assets)
+grows past its budget, the least recently recalled / oldest entries are
+evicted until it fits again, a bounded number per run.
+"""
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from memory_index import JournaledStore
+
+
+AREAS = ("concepts", "logs", "assets")
+DEFAULT_KEEP_TAGS = ("important", "pinned", "core")
+
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def log_period(key):
+    """
+    Time span a log unit (a YYYY-MM-DD day or a YYYY-MM archive) covers.
+    Returns: tuple (start, end) in epoch seconds, end exclusive
+    """
+    if len(key) == 7:
+        year, month = map(int, key.split("-"))
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+    else:
+        start = date.fromisoformat(key)
+        end = start + timedelta(days=1)
+    return tuple(datetime.combine(day, datetime.min.time()).timestamp() for day in (start, end))
+
+
+class AccessLog:
+    """
+    Last time each concept was recalled. Touches are coarsened to
+    `resolution` seconds, so a concept that comes up in every search
+    costs one journal line an hour rather than one per search.
+    """
+
+    def __init__(self, index_path, resolution=3600, compact_every=500):
+        self.store = JournaledStore(index_path, "access", compact_every)
+        self.resolution = resolution
+        self.lock = threading.Lock()
+        self.last = {}          # concept -> epoch seconds
+
+        snapshot, ops = self.store.load()
+        if snapshot:
+            self.last.update(snapshot.get("last", {}))
+        for op in ops:
+            if op.get("at") is None:
+                self.last.pop(op["doc"], None)
+            else:
+                self.last[op["doc"]] = op["at"]
+
+    def _log(self, op):
+        if self.store.append(op):
+            self.save()
+
+    def touch(self, names, now=None):
+        """Records that concepts were just recalled."""
+        now = int(now or time.time())
+        with self.lock:
+            for name in names:
+                if now - self.last.get(name, 0) >= self.resolution:
+                    self.last[name] = now
+                    self._log({"doc": name, "at": now})
+
+    def last_recalled(self, name):
+        """Epoch seconds of the last recall, or None if never recalled."""
+        return self.last.get(name)
+
+    def forget(self, name):
+        with self.lock:
+            if self.last.pop(name, None) is not None:
+                self._log({"doc": name, "at": None})
+
+    def save(self):
+        with self.lock:
+            self.store.write_snapshot({"version": 1, "last": self.last})
+
+
+class RetentionPolicy:
+    """
+    Byte budgets and eviction rules. Defaults come from env vars:
+
+        RILEY_RETENTION_CONCEPTS_MB    budget for concept notes (unlimited)
+        RILEY_RETENTION_LOGS_MB        budget for daily logs + archives (unlimited)
+        RILEY_RETENTION_ASSETS_MB      budget for images (unlimited)
+        RILEY_RETENTION_KEEP_TAGS      tags that are never evicted
+                                       (important,pinned,core)
+        RILEY_RETENTION_MIN_AGE_DAYS   nothing created or recalled more
+                                       recently is evicted (7)
+
+    Eviction order is least recently recalled first; notes that were never
+    recalled count from their creation (or last modification) time.
+    """
+
+    def __init__(self, budgets=None, keep_tags=None, min_age_days=None, max_evictions=100,
+                 asset_grace=3600):
+        """
+        Args:
+            budgets: Dict area -> bytes (None / missing = unlimited)
+            keep_tags: Frontmatter tags that protect a concept
+            min_age_days: Grace period for new or recently recalled entries
+            max_evictions: Per area and run, so one run stays short and
+                           a large backlog is worked off over several
+            asset_grace: Seconds an unreferenced asset is left alone (its
+                         note may still be on its way)
+        """
+        if budgets is None:
+            budgets = {}
+            for area in AREAS:
+                megabytes = _env_float(f"RILEY_RETENTION_{area.upper()}_MB", None)
+                if megabytes is not None:
+                    budgets[area] = int(megabytes * 1024 * 1024)
+        unknown = set(budgets) - set(AREAS)
+        if unknown:
+            raise ValueError(f"Unknown retention area(s) {', '.join(sorted(unknown))} "
+                             f"(expected {', '.join(AREAS)})")
+        self.budgets = budgets
+
+        if keep_tags is None:
+            keep_tags = os.getenv("RILEY_RETENTION_KEEP_TAGS", ",".join(DEFAULT_KEEP_TAGS)).split(",")
+        self.keep_tags = {tag.strip().lstrip("#") for tag in keep_tags if tag.strip()}
+        self.min_age = (min_age_days if min_age_days is not None
+                        else _env_float("RILEY_RETENTION_MIN_AGE_DAYS", 7)) * 86400
+        self.max_evictions = max_evictions
+        self.asset_grace = asset_grace
+
+    def budget(self, area):
+        """Byte budget for an area, or None if unlimited."""
+        return self.budgets.get(area)
+
+    def plan(self, candidates, excess, access, now=None, limit=None):
+        """
+        Picks what to evict to free `excess` bytes.
+
+        Args:
+            candidates: Iterable of (name, bytes, created, tags); created
+                        is epoch seconds (or None if unknown)
+            excess: Bytes over budget
+            access: AccessLog
+            limit: Evictions allowed (default max_evictions)
+
+        Returns: list of (name, bytes) in eviction order, at most `limit`
+                 long (may free less than `excess` if too much is
+                 protected)
+        """
+        limit = self.max_evictions if limit is None else limit
+        if excess <= 0 or limit <= 0:
+            return []
+        now = now or time.time()
+        cutoff = now - self.min_age
+
+        ranked = []
+        for name, size, created, tags in candidates:
+            if self.keep_tags.intersection(tags or ()):
+                continue
+            last_used = access.last_recalled(name) or created or 0
+            if (created or 0) > cutoff or last_used > cutoff:
+                continue
+            ranked.append((last_used, created or 0, name, size))
+        ranked.sort()
+
+        chosen, freed = [], 0
+        for last_used, created, name, size in ranked:
+            if freed >= excess or len(chosen) >= limit:
+                break
+            chosen.append((name, size))
+            freed += size
+        return chosen
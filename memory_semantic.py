@@ -0,0 +1,209 @@
+"""
+Semantic Index - Riley v2.0
+Offline "embedding" recall for the Obsidian Brain: hashed TF-IDF vectors
+kept in a memory-mapped float32 matrix. No network, no model download.
+"""
+import threading
+import zlib
+
+import numpy as np
+
+from memory_index import JournaledStore, tokenize
+
+
+SEMANTIC_DIM = 512
+
+
+def _features(text):
+    """
+    Word unigrams plus character trigrams of each word. The trigrams are
+    what let "optimisation" land near "optimization".
+    """
+    counts = {}
+    for word in tokenize(text):
+        counts[word] = counts.get(word, 0) + 1
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            gram = "#" + padded[i:i + 3]
+            counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def embed(text, dim=SEMANTIC_DIM):
+    """
+    Feature-hashes text into an L2-normalized float32 vector.
+    crc32 keeps bucket assignment stable across processes and machines.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, count in _features(text).items():
+        h = zlib.crc32(feature.encode("utf-8"))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vector[h % dim] += sign * (1.0 + np.log(count))
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def embed_document(doc_id, text):
+    """A concept's row vector (pure; rebuilds run it in worker processes)."""
+    return embed(f"{doc_id}\n{text}")
+
+
+class SemanticIndex:
+    """
+    One row per concept in knowledge_graph/.index/semantic.f32.
+
+    Document rows are stored without IDF so they never need rewriting as
+    the vault grows; IDF is applied to the query instead, which keeps a
+    search down to a single matrix-vector product.
+    """
+
+    def __init__(self, index_path, dim=SEMANTIC_DIM, compact_every=500):
+        self.dim = dim
+        self.analyzer = embed_document if dim == SEMANTIC_DIM else None
+        self.store = JournaledStore(index_path, "semantic", compact_every)
+        self.matrix_file = self.store.index_path / "semantic.f32"
+        self.lock = threading.RLock()
+
+        self.rows = {}         # concept -> row number
+        self.row_docs = []     # row number -> concept (None = free)
+        self.free_rows = []
+        self.df = np.zeros(dim, dtype=np.int64)
+        self.matrix = None
+        self.capacity = 0
+
+        self.loaded = self._load()
+
+    def _load(self):
+        snapshot, ops = self.store.load()
+        if snapshot is not None and snapshot.get("dim") != self.dim:
+            print("⚠️ [Semantic] Index dimension changed, rebuilding")
+            snapshot, ops = None, []
+        if (snapshot is not None or ops) and not self.matrix_file.exists():
+            snapshot, ops = None, []
+
+        if snapshot is None and not ops:
+            if self.matrix_file.exists():
+                self.matrix_file.unlink()
+            return False
+
+        rows = dict(snapshot.get("rows", {})) if snapshot else {}
+        for op in ops:
+            if op["op"] == "put":
+                rows[op["doc"]] = op["row"]
+            elif op["op"] == "del":
+                rows.pop(op["doc"], None)
+
+        high_water = max(rows.values(), default=-1) + 1
+        self._ensure_capacity(high_water)
+        self.rows = rows
+        self.row_docs = [None] * high_water
+        for doc_id, row in rows.items():
+            self.row_docs[row] = doc_id
+        self.free_rows = [row for row, doc_id in enumerate(self.row_docs) if doc_id is None]
+
+        used = sorted(rows.values())
+        if used:
+            self.df = np.count_nonzero(self.matrix[used], axis=0).astype(np.int64)
+        return True
+
+    def _ensure_capacity(self, n_rows):
+        if n_rows <= self.capacity and self.matrix is not None:
+            return
+        capacity = max(n_rows, self.capacity * 2, 1024)
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+
+        mode = 'r+b' if self.matrix_file.exists() else 'w+b'
+        self.store.index_path.mkdir(parents=True, exist_ok=True)
+        with open(self.matrix_file, mode) as f:
+            f.truncate(capacity * self.dim * 4)
+
+        self.matrix = np.memmap(self.matrix_file, dtype=np.float32, mode='r+',
+                                shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def __contains__(self, doc_id):
+        return doc_id in self.rows
+
+    def names(self):
+        """Concepts currently holding a row."""
+        with self.lock:
+            return list(self.rows)
+
+    def _log(self, op):
+        if self.store.append(op):
+            self.save()
+
+    def add_document(self, doc_id, text, analysis=None):
+        """Embeds a concept and writes its row in place."""
+        vector = analysis if analysis is not None else embed(f"{doc_id}\n{text}", self.dim)
+
+        with self.lock:
+            row = self.rows.get(doc_id)
+            if row is not None:
+                self.df -= (self.matrix[row] != 0)
+            elif self.free_rows:
+                row = self.free_rows.pop()
+            else:
+                row = len(self.row_docs)
+                self.row_docs.append(None)
+                self._ensure_capacity(row + 1)
+
+            self.matrix[row] = vector
+            self.df += (vector != 0)
+            self.rows[doc_id] = row
+            self.row_docs[row] = doc_id
+            self._log({"op": "put", "doc": doc_id, "row": row})
+
+    def remove_document(self, doc_id):
+        """Frees a concept's row."""
+        with self.lock:
+            row = self.rows.pop(doc_id, None)
+            if row is None:
+                return
+            self.df -= (self.matrix[row] != 0)
+            self.matrix[row] = 0.0
+            self.row_docs[row] = None
+            self.free_rows.append(row)
+            self._log({"op": "del", "doc": doc_id})
+
+    def search(self, query, limit=5):
+        """
+        Top-k cosine similarity against every concept.
+        Returns: list of (concept name, score), best first
+        """
+        with self.lock:
+            n_rows = len(self.row_docs)
+            if not self.rows or n_rows == 0:
+                return []
+
+            idf = np.log((1.0 + len(self.rows)) / (1.0 + self.df)).astype(np.float32) + 1.0
+            query_vector = embed(query, self.dim) * idf
+            norm = np.linalg.norm(query_vector)
+            if norm == 0:
+                return []
+            query_vector /= norm
+
+            scores = self.matrix[:n_rows] @ query_vector
+            k = min(limit, n_rows)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [(self.row_docs[row], float(scores[row]))
+                    for row in top
+                    if self.row_docs[row] is not None and scores[row] > 0]
+
+    def save(self):
+        """Flushes the matrix and compacts the row map."""
+        with self.lock:
+            if self.matrix is not None:
+                self.matrix.flush()
+            self.store.write_snapshot({
+                "version": 1,
+                "dim": self.dim,
+                "rows": self.rows
+            })
@@ -0,0 +1,1079 @@
+"""
+Brain Storage Backends - Riley v2.0
+Where the Obsidian Brain keeps concepts, daily logs, Core Knowledge and
+relationship edges.
+
+    file    Plain Markdown vault (default) - what Obsidian opens directly
+    sqlite  One WAL-mode database with FTS5 indexes, for cartridges with
+            tens of thousands of notes. export_markdown() / import_markdown()
+            convert to and from the vault layout.
+"""
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from memory_cache import ConceptCache, parse_frontmatter
+from memory_core import CoreKnowledge, parse_sections, plan_fact
+from memory_graph import RELATION_PATTERN, node_name
+from memory_index import InvertedIndex, TITLE_WEIGHT, analyze_document, tokenize
+from memory_rebuild import PARALLEL_THRESHOLD, IndexRebuilder
+from memory_journal import (
+    SOURCE_PATTERN, LogArchive, LogIndex, append_entries, log_file_for,
+    query_logs, read_spans, scan_entries
+)
+from soul_durability import fsync_dir
+from soul_stats import scan_folder
+
+
+CORE_KNOWLEDGE = "Core_Knowledge"
+DAY_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def safe_name(concept_name):
+    """Concept name -> file stem / row key (no characters a filesystem rejects)."""
+    return re.sub(r'[<>:"/\\|?*]', '_', concept_name)
+
+
+def relation_line(entity_a, relation, entity_b):
+    """One Relationship_Graph.md edge line."""
+    return f"- [[{entity_a}]] -- *{relation}* --> [[{entity_b}]]\n"
+
+
+def render_log(day, entries):
+    """Daily log Markdown for a list of (datetime, text), as append_entries() writes it."""
+    lines = [f"# Daily Log: {day}\n\n"]
+    lines += [f"**{when.strftime('%H:%M:%S')}** - {text}\n\n" for when, text in entries]
+    return "".join(lines)
+
+
+class FileBackend:
+    """
+    The Obsidian vault: concepts/*.md, logs/YYYY-MM-DD.md (old months packed
+    under logs/archive/) and Relationship_Graph.md, with the keyword index,
+    log sidecars and content cache kept under .index/.
+    """
+
+    kind = "file"
+
+    def __init__(self, cartridge):
+        self.vault_path = cartridge.soul_path / "knowledge_graph"
+        self.concepts_path = cartridge.concepts_path
+        self.logs_path = cartridge.logs_path
+        self.index_path = cartridge.index_path
+        self.rel_file = self.vault_path / "Relationship_Graph.md"
+        self.writer = cartridge.writer
+        self.stats = cartridge.stats
+        self.stats.attach(self.kind)
+
+        # Hot concepts (Core_Knowledge etc.) are served from memory
+        self.concept_cache = ConceptCache()
+        self.core_knowledge = CoreKnowledge(self.concepts_path / f"{CORE_KNOWLEDGE}.md")
+
+        # Inverted index so recall() doesn't scan the whole vault
+        self.index = InvertedIndex(self.index_path)
+
+        self.log_index = LogIndex(self.index_path / "logs")
+        self.log_archive = LogArchive(self.logs_path)
+
+        self.unsynced = set()   # files written by write_many() since the last sync()
+
+    def location(self):
+        return self.vault_path
+
+    # --- Concepts ---
+
+    def concept_file(self, name):
+        return self.concepts_path / f"{safe_name(name)}.md"
+
+    def exists(self, name):
+        return self.concept_file(name).exists()
+
+    def read(self, name):
+        """Concept content, or None. Served from the cache while unchanged on disk."""
+        return self.concept_cache.get(self.concept_file(name))
+
+    def frontmatter(self, name):
+        return self.concept_cache.get_frontmatter(self.concept_file(name))
+
+    def names(self):
+        return [concept_file.stem for concept_file in self.concepts_path.glob("*.md")]
+
+    def _concepts_mtime(self):
+        return self.concepts_path.stat().st_mtime_ns
+
+    def _indexed(self, concept_file, content, dir_mtime_before, deltas=None):
+        """
+        Updates the cache and inverted index after writing a concept file.
+        If concepts/ was in sync before our write, it still is afterwards.
+        The stats delta is recorded right away, or added to `deltas`
+        ([files, bytes]) for a batch to record once.
+        """
+        self.concept_cache.put(concept_file, content)
+        stat = concept_file.stat()
+        previous = self.index.docs.get(concept_file.stem)
+        files = 1 if previous is None else 0
+        size = stat.st_size - (0 if previous is None else previous["size"] or 0)
+        if deltas is None:
+            self.stats.record("concepts", files, size)
+        else:
+            deltas[0] += files
+            deltas[1] += size
+        dir_mtime = None
+        if dir_mtime_before == self.index.dir_mtime:
+            dir_mtime = self._concepts_mtime()
+
+        self.index.add_document(
+            concept_file.stem, content,
+            mtime=stat.st_mtime_ns, size=stat.st_size, dir_mtime=dir_mtime
+        )
+        return str(concept_file)
+
+    def write(self, name, content):
+        """Creates or replaces a concept. Returns its location."""
+        concept_file = self.concept_file(name)
+        dir_mtime_before = self._concepts_mtime()
+        self.writer.write_text(concept_file, content)
+        return self._indexed(concept_file, content, dir_mtime_before)
+
+    def write_many(self, docs):
+        """
+        Writes a batch of (name, content) concepts without syncing each one;
+        call sync() once afterwards.
+        Returns: list of locations
+        """
+        dir_mtime_before = self._concepts_mtime()
+        written = []
+        for name, content in docs:
+            concept_file = self.concept_file(name)
+            self.writer.write_text(concept_file, content, sync=False)
+            written.append((concept_file, content))
+        self.unsynced.update(concept_file for concept_file, content in written)
+
+        # Only the last update may claim concepts/ is still in sync
+        locations = []
+        deltas = [0, 0]
+        for concept_file, content in written:
+            locations.append(self._indexed(concept_file, content, dir_mtime_before, deltas))
+        self.stats.record("concepts", *deltas)
+        return locations
+
+    def sync(self):
+        """
+        Durability barrier for write_many(): fsyncs the files it wrote and
+        concepts/ once (a no-op under the "fast" durability policy).
+        """
+        paths, self.unsynced = self.unsynced, set()
+        if self.writer.policy == "fast" or not paths:
+            return
+        for concept_file in paths:
+            try:
+                with open(concept_file, 'rb+') as f:
+                    os.fsync(f.fileno())
+            except FileNotFoundError:
+                continue
+        fsync_dir(self.concepts_path)
+
+    def journaled_indexes(self):
+        """Backend-owned indexes, for memory_index.batched()."""
+        return [self.index]
+
+    def delete(self, name):
+        """
+        Removes a concept for good.
+        Returns: True if it existed
+        """
+        concept_file = self.concept_file(name)
+        dir_mtime_before = self._concepts_mtime()
+        try:
+            size = concept_file.stat().st_size
+            concept_file.unlink()
+        except FileNotFoundError:
+            return False
+        self.stats.record("concepts", -1, -size)
+        self.concept_cache.invalidate(concept_file)
+        self.index.remove_document(concept_file.stem)
+        if dir_mtime_before == self.index.dir_mtime:
+            self.index.set_dir_mtime(self._concepts_mtime())
+        return True
+
+    def concept_usage(self):
+        """Dict concept -> (bytes, modified epoch seconds), from the index's file stats."""
+        with self.index.lock:
+            return {name: (record["size"] or 0, (record["mtime"] or 0) / 1e9)
+                    for name, record in self.index.docs.items()}
+
+    def append(self, name, addition, full_content):
+        """Appends to a concept (full_content is the result, for the indexes)."""
+        concept_file = self.concept_file(name)
+        dir_mtime_before = self._concepts_mtime()
+        self.writer.append_text(concept_file, addition)
+        return self._indexed(concept_file, full_content, dir_mtime_before)
+
+    def reconcile(self, secondary_indexes, force=False, rebuild=False, workers=None, progress=None):
+        """
+        Reconciles the indexes with concepts/ (e.g. after Obsidian edits or
+        another device syncing new notes). Every note is stat()ed - an
+        in-place save doesn't change the folder mtime - and only the ones
+        whose mtime or size differ from the index are re-read. Large
+        backlogs (a fresh device, a deleted .index/) go through the
+        parallel IndexRebuilder.
+
+        Args:
+            force: Unused here (every note is always checked)
+            rebuild: Re-index every note, changed or not
+            workers: Worker processes for the analysis (default: CPU
+                     count once PARALLEL_THRESHOLD notes need reading)
+            progress: Callback(done, total) for long rebuilds
+
+        Returns: number of concepts re-indexed or dropped
+        """
+        dir_mtime = self._concepts_mtime()
+
+        on_disk = set()
+        stale = []      # (concept_file, stat, inverted index current?, indexes missing it)
+        for entry in os.scandir(self.concepts_path):
+            if entry.name.startswith(".") or not entry.name.endswith(".md"):
+                continue
+            concept_file = self.concepts_path / entry.name
+            name = concept_file.stem
+            on_disk.add(name)
+            try:
+                stat = entry.stat()
+            except OSError as e:
+                print(f"⚠️ Error reading {concept_file}: {e}")
+                continue
+            record = self.index.docs.get(name)
+            current = record and record["mtime"] == stat.st_mtime_ns and record["size"] == stat.st_size
+            missing = [index for index in secondary_indexes if name not in index]
+            if rebuild:
+                stale.append((concept_file, stat, False, secondary_indexes))
+            elif not current or missing:
+                stale.append((concept_file, stat, current, missing))
+
+        def read(item):
+            concept_file = item[0]
+            try:
+                with open(concept_file, 'r', encoding='utf-8') as f:
+                    return concept_file.stem, f.read()
+            except Exception as e:
+                print(f"⚠️ Error reading {concept_file}: {e}")
+                return None
+
+        def apply(item, name, content, analyses):
+            concept_file, stat, current, missing = item
+            if not current:
+                self.index.add_document(name, content, mtime=stat.st_mtime_ns, size=stat.st_size,
+                                        analysis=analyses and analyses[0])
+                missing = secondary_indexes
+            for index in missing:
+                position = secondary_indexes.index(index) + 1
+                index.add_document(name, content, analysis=analyses and analyses[position])
+
+        if stale and (workers or len(stale) >= PARALLEL_THRESHOLD):
+            analyzers = [analyze_document] + [getattr(index, "analyzer", None) for index in secondary_indexes]
+            rebuilder = IndexRebuilder(workers=workers, progress=progress)
+            changed = rebuilder.run(stale, read, analyzers, apply, [self.index] + secondary_indexes)
+        else:
+            changed = 0
+            for item in stale:
+                result = read(item)
+                if result is not None:
+                    apply(item, *result, None)
+                    changed += 1
+
+        for name in set(self.index.docs) - on_disk:
+            self.index.remove_document(name)
+            changed += 1
+        for index in secondary_indexes:
+            for name in [name for name in index.names() if name not in on_disk]:
+                index.remove_document(name)
+
+        self.index.set_dir_mtime(dir_mtime)
+        self.index.loaded = True
+        for index in secondary_indexes:
+            index.loaded = True
+        if changed:
+            self.index.save()
+            for index in secondary_indexes:
+                index.save()
+            print(f"🗂️ [Brain] Indexed {changed} changed concepts ({len(self.index.docs)} total)")
+        return changed
+
+    def recall(self, query):
+        """
+        Substring match on name or content. Candidates come from the
+        inverted index, so only concepts that contain every query term are
+        opened to confirm the match. If concepts/ changed since the index
+        last looked (e.g. notes synced in from another device), the notes
+        the index doesn't know yet are checked directly.
+        """
+        query_lower = query.lower()
+        candidates = self.index.candidates(query)
+        if candidates is None:
+            # Nothing indexable in the query (e.g. pure punctuation)
+            return self._scan_recall(query_lower)
+
+        # A lone term hit inside an indexed term is already a substring match
+        single_term = tokenize(query) == [query_lower]
+
+        matches = []
+        for name in sorted(candidates):
+            if single_term or query_lower in name.lower():
+                matches.append(name)
+                continue
+
+            concept_file = self.concepts_path / f"{name}.md"
+            try:
+                content = self.concept_cache.get(concept_file)
+                if content is not None and query_lower in content.lower():
+                    matches.append(name)
+            except Exception as e:
+                print(f"⚠️ Error reading {concept_file}: {e}")
+
+        if self.index.dir_mtime != self._concepts_mtime():
+            seen = set(matches)
+            matches += sorted(self._unindexed_matches(query_lower, seen))
+        return matches
+
+    def iter_recall(self, query, deadline=None):
+        """
+        Yields substring matches as they are confirmed: index candidates
+        first, then concepts the index hasn't caught up with (new or
+        edited on disk since the last sync). Stops once time.monotonic()
+        passes `deadline`.
+        """
+        query_lower = query.lower()
+        candidates = self.index.candidates(query)
+        single_term = candidates is not None and tokenize(query) == [query_lower]
+        seen = set()
+
+        for name in sorted(candidates or ()):
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            if single_term or query_lower in name.lower():
+                seen.add(name)
+                yield name
+                continue
+            content = self.concept_cache.get(self.concepts_path / f"{name}.md")
+            if content is not None and query_lower in content.lower():
+                seen.add(name)
+                yield name
+
+        # Unindexed tail (everything, if the query had no indexable terms)
+        if candidates is not None and self.index.dir_mtime == self._concepts_mtime():
+            return
+        yield from self._unindexed_matches(query_lower, seen, deadline, indexed=candidates is not None)
+
+    def _unindexed_matches(self, query_lower, seen, deadline=None, indexed=True):
+        """
+        Yields matches among the notes the index hasn't caught up with (new
+        or edited on disk since the last sync), or among all notes if
+        `indexed` is False. Names in `seen` are skipped.
+        """
+        for concept_file in self.concepts_path.glob("*.md"):
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            name = concept_file.stem
+            if name in seen:
+                continue
+            if indexed:
+                record = self.index.docs.get(name)
+                stat = concept_file.stat()
+                if record and record["mtime"] == stat.st_mtime_ns and record["size"] == stat.st_size:
+                    continue
+            try:
+                content = self.concept_cache.get(concept_file)
+            except Exception as e:
+                print(f"⚠️ Error reading {concept_file}: {e}")
+                continue
+            if query_lower in name.lower() or (content is not None and query_lower in content.lower()):
+                yield name
+
+    def _scan_recall(self, query_lower):
+        """Full-vault grep fallback for queries the index can't narrow down."""
+        matches = []
+
+        for concept_file in self.concepts_path.glob("*.md"):
+            # Search in filename
+            if query_lower in concept_file.stem.lower():
+                matches.append(concept_file.stem)
+                continue
+
+            # Search in content
+            try:
+                with open(concept_file, 'r', encoding='utf-8') as f:
+                    content = f.read().lower()
+                    if query_lower in content:
+                        matches.append(concept_file.stem)
+            except Exception as e:
+                print(f"⚠️ Error reading {concept_file}: {e}")
+
+        return matches
+
+    def rank(self, query, limit):
+        return self.index.rank(query, limit)
+
+    def cache_stats(self):
+        return self.concept_cache.stats()
+
+    # --- Core Knowledge ---
+
+    def add_fact(self, category, fact, timestamp):
+        """
+        Splices a fact in under its ## heading.
+        Returns: tuple (location, new Core_Knowledge content)
+        """
+        core_file = self.core_knowledge.core_file
+        dir_mtime_before = self._concepts_mtime()
+        content = self.core_knowledge.add_fact(category, fact, timestamp)
+        return self._indexed(core_file, content, dir_mtime_before), content
+
+    def get_facts(self, category):
+        return self.core_knowledge.get_facts(category)
+
+    # --- Daily logs ---
+
+    def log_location(self, when):
+        return log_file_for(self.logs_path, when)
+
+    def append_logs(self, entries):
+        written = append_entries(self.logs_path, entries, self.log_index)
+        for size, created in written.values():
+            self.stats.record("logs", int(created), size)
+
+    def query_logs(self, start, end, source=None):
+        return query_logs(self.logs_path, self.log_index, start, end, source, self.log_archive)
+
+    def get_log(self, day):
+        log_file = self.logs_path / f"{day.isoformat()}.md"
+
+        content = self.log_archive.read_day(day)
+        content = content.decode('utf-8', errors='replace') if content is not None else None
+        if log_file.exists():
+            with open(log_file, 'r', encoding='utf-8') as f:
+                content = (content or "") + f.read()
+        return content
+
+    def archive_logs(self, older_than_days):
+        """
+        Packs daily logs older than N days into compressed monthly archives.
+        Returns: tuple (logs archived, raw bytes, packed bytes)
+        """
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).strftime("%Y-%m-%d")
+        archived, raw_bytes, packed_bytes = 0, 0, 0
+        # archive/ holds two small files per month: diffing it is cheap and
+        # exact, where the packed sizes would miss the member indexes
+        before = scan_folder(self.log_archive.archive_path)
+
+        for log_file in sorted(self.logs_path.glob("*.md")):
+            if not DAY_PATTERN.fullmatch(log_file.stem) or log_file.stem >= cutoff:
+                continue
+            try:
+                raw, packed = self.log_archive.archive(log_file)
+            except Exception as e:
+                print(f"⚠️ [Brain] Could not archive {log_file.name}: {e}")
+                continue
+            sidecar = self.log_index.index_dir / f"{log_file.stem}.idx"
+            if sidecar.exists():
+                sidecar.unlink()
+            archived += 1
+            raw_bytes += raw
+            packed_bytes += packed
+
+        if archived:
+            after = scan_folder(self.log_archive.archive_path)
+            self.stats.record("logs", after["files"] - before["files"] - archived,
+                              after["bytes"] - before["bytes"] - raw_bytes)
+        return archived, raw_bytes, packed_bytes
+
+    def log_usage(self):
+        """
+        Bytes per log unit, oldest first: list of (key, bytes) where key
+        is a day (YYYY-MM-DD, a plain daily log and its sidecar) or a
+        month (YYYY-MM, its compressed archive).
+        """
+        units = self.log_archive.months()
+        for log_file in self.logs_path.glob("*.md"):
+            if DAY_PATTERN.fullmatch(log_file.stem):
+                sidecar = self.log_index.index_dir / f"{log_file.stem}.idx"
+                units[log_file.stem] = log_file.stat().st_size + (sidecar.stat().st_size if sidecar.exists() else 0)
+        return sorted(units.items())
+
+    def drop_logs(self, key):
+        """
+        Deletes a log unit from log_usage() for good.
+        Returns: bytes freed
+        """
+        if len(key) == 7:
+            before = scan_folder(self.log_archive.archive_path)
+            freed = self.log_archive.drop_month(key)
+            after = scan_folder(self.log_archive.archive_path)
+            self.stats.record("logs", after["files"] - before["files"], after["bytes"] - before["bytes"])
+            return freed
+        freed = 0
+        for path in (self.logs_path / f"{key}.md", self.log_index.index_dir / f"{key}.idx"):
+            if path.exists():
+                size = path.stat().st_size
+                path.unlink()
+                freed += size
+                if path.suffix == ".md":
+                    self.stats.record("logs", -1, -size)
+        return freed
+
+    # --- Relationship edges ---
+
+    def add_relation(self, entity_a, relation, entity_b):
+        with open(self.rel_file, "a", encoding="utf-8") as f:
+            f.write(relation_line(entity_a, relation, entity_b))
+
+    def sync_relations(self, graph):
+        """Feeds edges added since the graph index last looked into it."""
+        return graph.sync_relationships(self.rel_file)
+
+    # --- Markdown interchange (the vault already is Markdown: plain copies) ---
+
+    def export_markdown(self, vault_path):
+        for folder in ("concepts", "logs"):
+            shutil.copytree(self.vault_path / folder, vault_path / folder, dirs_exist_ok=True)
+        edges = 0
+        if self.rel_file.exists():
+            shutil.copy2(self.rel_file, vault_path / "Relationship_Graph.md")
+            with open(self.rel_file, 'r', encoding='utf-8') as f:
+                edges = sum(1 for line in f if RELATION_PATTERN.match(line.rstrip("\n")))
+        return {"concepts": len(self.names()), "logs": len(list(self.logs_path.glob("*.md"))), "edges": edges}
+
+    def import_markdown(self, vault_path):
+        """Copies another vault's concepts and logs in (same-named files are overwritten)."""
+        counts = {"concepts": 0, "logs": 0, "edges": 0}
+        for folder in ("concepts", "logs"):
+            source = vault_path / folder
+            if source.exists():
+                counts[folder] = len(list(source.glob("*.md")))
+                shutil.copytree(source, self.vault_path / folder, dirs_exist_ok=True)
+        # Copied logs and archives invalidate their offset sidecars
+        shutil.rmtree(self.log_index.index_dir, ignore_errors=True)
+        self.log_archive = LogArchive(self.logs_path)
+        self.stats.reconcile()
+        return counts
+
+    def close(self):
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS concepts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    created TEXT,
+    tags TEXT,
+    updated REAL NOT NULL
+);
+
+-- Word index for BM25 ranking, trigram index for substring recall.
+-- Both are external-content tables kept in step by the triggers below.
+CREATE VIRTUAL TABLE IF NOT EXISTS concepts_fts USING fts5(
+    name, content, content='concepts', content_rowid='id'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS concepts_grams USING fts5(
+    name, content, content='concepts', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS concepts_ai AFTER INSERT ON concepts BEGIN
+    INSERT INTO concepts_fts(rowid, name, content) VALUES (new.id, new.name, new.content);
+    INSERT INTO concepts_grams(rowid, name, content) VALUES (new.id, new.name, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS concepts_ad AFTER DELETE ON concepts BEGIN
+    INSERT INTO concepts_fts(concepts_fts, rowid, name, content) VALUES ('delete', old.id, old.name, old.content);
+    INSERT INTO concepts_grams(concepts_grams, rowid, name, content) VALUES ('delete', old.id, old.name, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS concepts_au AFTER UPDATE ON concepts BEGIN
+    INSERT INTO concepts_fts(concepts_fts, rowid, name, content) VALUES ('delete', old.id, old.name, old.content);
+    INSERT INTO concepts_grams(concepts_grams, rowid, name, content) VALUES ('delete', old.id, old.name, old.content);
+    INSERT INTO concepts_fts(rowid, name, content) VALUES (new.id, new.name, new.content);
+    INSERT INTO concepts_grams(rowid, name, content) VALUES (new.id, new.name, new.content);
+END;
+
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY,
+    stamp TEXT NOT NULL,            -- YYYY-MM-DD HH:MM:SS
+    source TEXT,                    -- [SOURCE] tag from log_episode()
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS logs_stamp ON logs(stamp);
+
+CREATE TABLE IF NOT EXISTS edges (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    relation TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+"""
+
+
+class SQLiteBackend:
+    """
+    Everything in knowledge_graph/brain.db.
+
+    WAL journaling lets readers run alongside the writer. The synchronous
+    level follows the cartridge durability policy; the default (NORMAL)
+    only fsyncs at checkpoints, which keeps a learn() to one small write.
+    Keyword search is done by FTS5 inside the database, so no .index/
+    keyword index is needed.
+    """
+
+    kind = "sqlite"
+
+    def __init__(self, cartridge, db_path=None):
+        self.vault_path = cartridge.soul_path / "knowledge_graph"
+        self.db_path = db_path or self.vault_path / "brain.db"
+        self.index_path = cartridge.index_path / "sqlite"
+        self.index_path.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # fast -> OFF, balanced -> NORMAL (fsync at checkpoints), strict -> FULL
+        synchronous = {"fast": "OFF", "balanced": "NORMAL", "strict": "FULL"}[cartridge.writer.policy]
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        with self.lock, self.conn:
+            self.conn.executescript(SCHEMA)
+
+        # Concepts and logs are rows here, so the stats manifest counts
+        # rows (concepts) and days (logs) and their text bytes
+        self.stats = cartridge.stats
+        self.stats.attach(self.kind, self.stat_counts)
+
+    def location(self):
+        return self.db_path
+
+    def stat_counts(self):
+        """Stats for the concepts and logs held in the database (see CartridgeStats.attach)."""
+        concepts = self._query(
+            "SELECT COUNT(*), COALESCE(SUM(length(CAST(content AS BLOB))), 0), MAX(updated) FROM concepts")[0]
+        logs = self._query(
+            "SELECT COUNT(DISTINCT substr(stamp, 1, 10)), COALESCE(SUM(length(CAST(text AS BLOB))), 0), "
+            "MAX(stamp) FROM logs")[0]
+        last_log = datetime.strptime(logs[2], "%Y-%m-%d %H:%M:%S").timestamp() if logs[2] else None
+        return {
+            "concepts": {"files": concepts[0], "bytes": concepts[1], "modified": concepts[2]},
+            "logs": {"files": logs[0], "bytes": logs[1], "modified": last_log},
+        }
+
+    def _stored_size(self, name):
+        """Bytes of a stored concept's text, or None if it doesn't exist."""
+        row = self.conn.execute("SELECT length(CAST(content AS BLOB)) FROM concepts WHERE name = ?",
+                                (name,)).fetchone()
+        return row[0] if row else None
+
+    def _record_upsert(self, rows, previous):
+        """Reports upserted rows to the stats manifest (previous: sizes before, None = new)."""
+        added = sum(1 for size in previous if size is None)
+        delta = sum(len(row[1].encode('utf-8')) - (size or 0) for row, size in zip(rows, previous))
+        self.stats.record("concepts", added, delta)
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # --- Concepts ---
+
+    def exists(self, name):
+        return bool(self._query("SELECT 1 FROM concepts WHERE name = ?", (safe_name(name),)))
+
+    def read(self, name):
+        rows = self._query("SELECT content FROM concepts WHERE name = ?", (safe_name(name),))
+        return rows[0][0] if rows else None
+
+    def frontmatter(self, name):
+        content = self.read(name)
+        return parse_frontmatter(content) if content is not None else None
+
+    def names(self):
+        return [row[0] for row in self._query("SELECT name FROM concepts")]
+
+    def _row(self, name, content, updated):
+        meta = parse_frontmatter(content)
+        tags = meta.get("tags")
+        return (safe_name(name), content, meta.get("created"),
+                ",".join(tags) if isinstance(tags, list) else tags, updated)
+
+    def _upsert(self, rows):
+        self.conn.executemany(
+            "INSERT INTO concepts (name, content, created, tags, updated) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET content = excluded.content, created = excluded.created, "
+            "tags = excluded.tags, updated = excluded.updated",
+            rows
+        )
+
+    def write(self, name, content):
+        return self.write_many([(name, content)])[0]
+
+    def write_many(self, docs):
+        """Writes a batch of (name, content) concepts in one transaction."""
+        updated = datetime.now().timestamp()
+        rows = [self._row(name, content, updated) for name, content in docs]
+        with self.lock:
+            with self.conn:
+                previous = [self._stored_size(row[0]) for row in rows]
+                self._upsert(rows)
+            self._record_upsert(rows, previous)
+        return [f"{self.db_path}#{row[0]}" for row in rows]
+
+    def sync(self):
+        """Durability barrier: checkpoints the WAL into the database file."""
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def journaled_indexes(self):
+        return []
+
+    def delete(self, name):
+        with self.lock:
+            with self.conn:
+                size = self._stored_size(safe_name(name))
+                self.conn.execute("DELETE FROM concepts WHERE name = ?", (safe_name(name),))
+            if size is None:
+                return False
+            self.stats.record("concepts", -1, -size)
+            return True
+
+    def concept_usage(self):
+        """
+        Dict concept -> (bytes, modified epoch seconds). Bytes are the
+        stored text; the database file itself only shrinks on VACUUM.
+        """
+        return {name: (size or 0, updated or 0) for name, size, updated in self._query(
+            "SELECT name, length(CAST(content AS BLOB)), updated FROM concepts")}
+
+    def append(self, name, addition, full_content):
+        return self.write(name, full_content)
+
+    def reconcile(self, secondary_indexes, force=False, rebuild=False, workers=None, progress=None):
+        """
+        Brings the secondary indexes in line with the concepts table.
+        Concepts only change through this backend, so unless `rebuild` is
+        set just the names each index is missing (or has extra) are
+        touched. Large backlogs go through the parallel IndexRebuilder.
+
+        Returns: number of concepts re-indexed or dropped
+        """
+        stored = self.names()
+        known = {id(index): set(index.names()) for index in secondary_indexes}
+        stale = []      # (name, indexes missing it)
+        for name in sorted(stored):
+            missing = [index for index in secondary_indexes
+                       if rebuild or not index.loaded or name not in known[id(index)]]
+            if missing:
+                stale.append((name, missing))
+
+        def read(item):
+            content = self.read(item[0])
+            return None if content is None else (item[0], content)
+
+        def apply(item, name, content, analyses):
+            for index in item[1]:
+                position = secondary_indexes.index(index)
+                index.add_document(name, content, analysis=analyses and analyses[position])
+
+        if stale and (workers or len(stale) >= PARALLEL_THRESHOLD):
+            analyzers = [getattr(index, "analyzer", None) for index in secondary_indexes]
+            rebuilder = IndexRebuilder(workers=workers, progress=progress)
+            changed = rebuilder.run(stale, read, analyzers, apply, secondary_indexes)
+        else:
+            changed = 0
+            for item in stale:
+                result = read(item)
+                if result is not None:
+                    apply(item, *result, None)
+                    changed += 1
+
+        stored = set(stored)
+        dropped = set()
+        for index in secondary_indexes:
+            for name in [name for name in index.names() if name not in stored]:
+                index.remove_document(name)
+                dropped.add(name)
+        changed += len(dropped)
+        for index in secondary_indexes:
+            index.loaded = True
+            if changed:
+                index.save()
+        if changed:
+            print(f"🗂️ [Brain] Indexed {changed} changed concepts ({len(stored)} total)")
+        return changed
+
+    def recall(self, query):
+        """
+        Substring match on name or content. Queries of 3+ characters are
+        narrowed by the trigram index; the match is confirmed in Python so
+        results are identical to the file backend.
+        """
+        query_lower = query.lower()
+        if len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            rows = self._query(
+                "SELECT c.name, c.content FROM concepts_grams g JOIN concepts c ON c.id = g.rowid "
+                "WHERE concepts_grams MATCH ?", (phrase,)
+            )
+        else:
+            rows = self._query("SELECT name, content FROM concepts")
+        return sorted(name for name, content in rows
+                      if query_lower in name.lower() or query_lower in content.lower())
+
+    def iter_recall(self, query, deadline=None):
+        """
+        Yields substring matches in name order, fetching and confirming one
+        candidate at a time so an early stop skips the rest.
+        """
+        query_lower = query.lower()
+        if len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            ids = self._query(
+                "SELECT c.id FROM concepts_grams g JOIN concepts c ON c.id = g.rowid "
+                "WHERE concepts_grams MATCH ? ORDER BY c.name", (phrase,)
+            )
+        else:
+            ids = self._query("SELECT id FROM concepts ORDER BY name")
+
+        for (row_id,) in ids:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            rows = self._query("SELECT name, content FROM concepts WHERE id = ?", (row_id,))
+            if rows and (query_lower in rows[0][0].lower() or query_lower in rows[0][1].lower()):
+                yield rows[0][0]
+
+    def rank(self, query, limit):
+        """BM25 via FTS5, titles weighted like the file backend's index."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        rows = self._query(
+            f"SELECT c.name, bm25(concepts_fts, {TITLE_WEIGHT}, 1.0) AS score "
+            "FROM concepts_fts JOIN concepts c ON c.id = concepts_fts.rowid "
+            "WHERE concepts_fts MATCH ? ORDER BY score, c.name LIMIT ?",
+            (match, limit)
+        )
+        # FTS5 reports BM25 negated (lower is better)
+        return [(name, -score) for name, score in rows]
+
+    def cache_stats(self):
+        return {"backend": self.kind}
+
+    # --- Core Knowledge ---
+
+    def add_fact(self, category, fact, timestamp):
+        with self.lock:
+            data = (self.read(CORE_KNOWLEDGE) or "").encode('utf-8')
+            sections, facts = parse_sections(data)
+            position, entry = plan_fact(data, sections, category, fact, timestamp)
+            content = (data[:position] + entry + data[position:]).decode('utf-8')
+            return self.write(CORE_KNOWLEDGE, content), content
+
+    def get_facts(self, category):
+        sections, facts = parse_sections((self.read(CORE_KNOWLEDGE) or "").encode('utf-8'))
+        return list(facts.get(category, []))
+
+    # --- Daily logs ---
+
+    def log_location(self, when):
+        return f"{self.db_path}#logs/{when.strftime('%Y-%m-%d')}"
+
+    def append_logs(self, entries):
+        days = {when.strftime("%Y-%m-%d") for when, text in entries}
+        with self.lock:
+            with self.conn:
+                new_days = sum(1 for day in days if not self.conn.execute(
+                    "SELECT 1 FROM logs WHERE stamp >= ? AND stamp < ? LIMIT 1",
+                    (day, (date.fromisoformat(day) + timedelta(days=1)).isoformat())
+                ).fetchone())
+                self._insert_logs(entries)
+            self.stats.record("logs", new_days, sum(len(text.encode('utf-8')) for when, text in entries))
+
+    def _insert_logs(self, entries):
+        rows = []
+        for when, text in entries:
+            tag = SOURCE_PATTERN.match(text)
+            rows.append((when.strftime("%Y-%m-%d %H:%M:%S"), tag.group(1) if tag else None, text))
+        self.conn.executemany("INSERT INTO logs (stamp, source, text) VALUES (?, ?, ?)", rows)
+
+    def query_logs(self, start, end, source=None):
+        sql = "SELECT stamp, text FROM logs WHERE stamp BETWEEN ? AND ?"
+        params = [start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")]
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+        for stamp, text in self._query(sql + " ORDER BY stamp, id", params):
+            yield datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S"), text
+
+    def _day_entries(self, day):
+        rows = self._query(
+            "SELECT stamp, text FROM logs WHERE stamp >= ? AND stamp < ? ORDER BY stamp, id",
+            (day.isoformat(), (day + timedelta(days=1)).isoformat())
+        )
+        return [(datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S"), text) for stamp, text in rows]
+
+    def get_log(self, day):
+        entries = self._day_entries(day)
+        return render_log(day.isoformat(), entries) if entries else None
+
+    def log_days(self):
+        return [row[0] for row in self._query("SELECT DISTINCT substr(stamp, 1, 10) FROM logs ORDER BY 1")]
+
+    def log_usage(self):
+        """Bytes of log text per day, oldest first: list of (YYYY-MM-DD, bytes)."""
+        return self._query(
+            "SELECT substr(stamp, 1, 10), SUM(length(CAST(text AS BLOB))) FROM logs GROUP BY 1 ORDER BY 1"
+        )
+
+    def drop_logs(self, key):
+        span = (key, (date.fromisoformat(key) + timedelta(days=1)).isoformat())
+        with self.lock, self.conn:
+            freed = self.conn.execute(
+                "SELECT SUM(length(CAST(text AS BLOB))) FROM logs WHERE stamp >= ? AND stamp < ?", span
+            ).fetchone()[0]
+            self.conn.execute("DELETE FROM logs WHERE stamp >= ? AND stamp < ?", span)
+        if freed is not None:
+            self.stats.record("logs", -1, -freed)
+        return freed or 0
+
+    def archive_logs(self, older_than_days):
+        # Log rows are already stored compactly; there's no cold tier
+        return 0, 0, 0
+
+    # --- Relationship edges ---
+
+    def add_relation(self, entity_a, relation, entity_b):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO edges (source, relation, target) VALUES (?, ?, ?)",
+                (entity_a, relation, entity_b)
+            )
+
+    def sync_relations(self, graph):
+        """Feeds edges with a row id past the graph index's offset into it."""
+        rows = self._query(
+            "SELECT id, source, relation, target FROM edges WHERE id > ? ORDER BY id",
+            (graph.rel_offset,)
+        )
+        if rows:
+            graph.add_relations(
+                [[node_name(source), relation, node_name(target)] for _, source, relation, target in rows],
+                rows[-1][0]
+            )
+        return len(rows)
+
+    # --- Markdown interchange ---
+
+    def export_markdown(self, vault_path):
+        """
+        Writes the database out as an Obsidian vault: concepts/*.md,
+        logs/YYYY-MM-DD.md and Relationship_Graph.md.
+
+        Returns: dict of counts
+        """
+        concepts_path = vault_path / "concepts"
+        logs_path = vault_path / "logs"
+        concepts_path.mkdir(parents=True, exist_ok=True)
+        logs_path.mkdir(parents=True, exist_ok=True)
+
+        concepts = self._query("SELECT name, content FROM concepts ORDER BY name")
+        for name, content in concepts:
+            with open(concepts_path / f"{name}.md", 'w', encoding='utf-8') as f:
+                f.write(content)
+
+        days = self.log_days()
+        for day in days:
+            with open(logs_path / f"{day}.md", 'w', encoding='utf-8') as f:
+                f.write(render_log(day, self._day_entries(date.fromisoformat(day))))
+
+        edges = self._query("SELECT source, relation, target FROM edges ORDER BY id")
+        with open(vault_path / "Relationship_Graph.md", 'w', encoding='utf-8') as f:
+            f.write("# Relationship Graph\n\n")
+            f.write("".join(relation_line(*edge) for edge in edges))
+
+        return {"concepts": len(concepts), "logs": len(days), "edges": len(edges)}
+
+    def import_markdown(self, vault_path):
+        """
+        Loads an Obsidian vault (file backend layout, including archived
+        logs). Concepts are upserted, each imported day replaces that day's
+        log rows, and edges already in the database are skipped, so
+        importing the same vault twice changes nothing.
+
+        Returns: dict of counts
+        """
+        concepts = 0
+        for concept_file in sorted((vault_path / "concepts").glob("*.md")):
+            with open(concept_file, 'r', encoding='utf-8') as f:
+                self.write(concept_file.stem, f.read())
+            concepts += 1
+
+        logs_path = vault_path / "logs"
+        days = {}
+        archive = LogArchive(logs_path)
+        if archive.archive_path.exists():
+            for day in archive.days():
+                days.setdefault(day, []).extend(archive.read_members(date.fromisoformat(day)))
+        for log_file in sorted(logs_path.glob("*.md")):
+            if DAY_PATTERN.fullmatch(log_file.stem):
+                days.setdefault(log_file.stem, []).append(log_file.read_bytes())
+
+        for day, blocks in sorted(days.items()):
+            day_start = datetime.fromisoformat(day)
+            entries = []
+            for data in blocks:
+                entries += read_spans(data, 0, scan_entries(data), day_start)
+            entries.sort(key=lambda entry: entry[0])
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "DELETE FROM logs WHERE stamp >= ? AND stamp < ?",
+                    (day, (day_start + timedelta(days=1)).strftime("%Y-%m-%d"))
+                )
+                self._insert_logs(entries)
+
+        edges = 0
+        rel_file = vault_path / "Relationship_Graph.md"
+        if rel_file.exists():
+            known = set(self._query("SELECT source, relation, target FROM edges"))
+            with open(rel_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    match = RELATION_PATTERN.match(line.rstrip("\n"))
+                    if match and match.groups() not in known:
+                        known.add(match.groups())
+                        self.add_relation(*match.groups())
+                        edges += 1
+
+        # Replaced log days aren't tracked as deltas: recount
+        self.stats.reconcile()
+        return {"concepts": concepts, "logs": len(days), "edges": edges}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+BACKENDS = {
+    "file": FileBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def open_backend(cartridge, backend=None):
+    """
+    Args:
+        backend: "file", "sqlite", a backend instance, or None for the
+                 RILEY_BRAIN_BACKEND env var (default "file")
+    """
+    if backend is None:
+        backend = os.getenv("RILEY_BRAIN_BACKEND", "file")
+    if not isinstance(backend, str):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown brain backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[backend](cartridge)
@@ -0,0 +1,98 @@
+"""
+Visual Memory Pipeline - Riley v2.0
+Turns a screenshot into what actually gets stored: a downscaled JPEG/WebP,
+a small thumbnail for the memory note and, only if asked, the original.
+"""
+import io
+import os
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+FORMATS = {
+    "jpeg": ("JPEG", "jpg"),
+    "webp": ("WEBP", "webp"),
+    "png": ("PNG", "png"),
+}
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+class VisualPipeline:
+    """
+    Encoding settings for visual memories. Defaults come from the
+    RILEY_VISION_* env vars:
+
+        RILEY_VISION_MAX_DIM        longest side of the stored image (1600)
+        RILEY_VISION_FORMAT         jpeg | webp | png (jpeg)
+        RILEY_VISION_QUALITY        1-100 for jpeg/webp (80)
+        RILEY_VISION_THUMB_DIM      longest side of the note thumbnail (320)
+        RILEY_VISION_KEEP_ORIGINAL  1 = also keep the full-size PNG (0)
+    """
+
+    def __init__(self, max_dim=None, fmt=None, quality=None, thumb_dim=None, keep_original=None):
+        self.max_dim = max_dim or _env_int("RILEY_VISION_MAX_DIM", 1600)
+        self.fmt = (fmt or os.getenv("RILEY_VISION_FORMAT", "jpeg")).lower()
+        if self.fmt == "jpg":
+            self.fmt = "jpeg"
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unknown image format '{self.fmt}' (expected one of {', '.join(FORMATS)})")
+        self.quality = quality or _env_int("RILEY_VISION_QUALITY", 80)
+        self.thumb_dim = thumb_dim or _env_int("RILEY_VISION_THUMB_DIM", 320)
+        if keep_original is None:
+            keep_original = os.getenv("RILEY_VISION_KEEP_ORIGINAL", "0") == "1"
+        self.keep_original = keep_original
+
+    @staticmethod
+    def available():
+        """True if Pillow is installed (otherwise images are stored as given)."""
+        return Image is not None
+
+    def _encode(self, image, fmt, max_dim):
+        pil_format, ext = FORMATS[fmt]
+        if max(image.size) > max_dim:
+            image = image.copy()
+            image.thumbnail((max_dim, max_dim), Image.LANCZOS)
+        if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        buffer = io.BytesIO()
+        if pil_format == "PNG":
+            image.save(buffer, format="PNG", optimize=False, compress_level=6)
+        else:
+            image.save(buffer, format=pil_format, quality=self.quality)
+        return buffer.getvalue(), ext
+
+    def process(self, image, keep_original=None):
+        """
+        Args:
+            image: PIL.Image or encoded image bytes
+            keep_original: Override the configured keep-original setting
+
+        Returns: dict with "image", "thumbnail" and "original" entries,
+                 each (bytes, extension) or None
+        """
+        if Image is None:
+            raise RuntimeError("Pillow is not installed")
+        if keep_original is None:
+            keep_original = self.keep_original
+
+        original_bytes = image if isinstance(image, (bytes, bytearray)) else None
+        if original_bytes is not None:
+            image = Image.open(io.BytesIO(original_bytes))
+            image.load()
+
+        stored = self._encode(image, self.fmt, self.max_dim)
+        thumbnail = self._encode(image, self.fmt, self.thumb_dim)
+
+        original = None
+        if keep_original:
+            original = (bytes(original_bytes), None) if original_bytes is not None \
+                else self._encode(image, "png", max(image.size))
+        return {"image": stored, "thumbnail": thumbnail, "original": original}
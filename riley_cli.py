@@ -6,6 +6,7 @@ import argparse
 import json
 import sys
 import os
+import time
 
 def load_soul():
     """Load Riley's soul data"""
@@ -14,28 +15,64 @@ def load_soul():
             return json.load(f)
     return None
 
-def display_status():
+def format_bytes(size):
+    """Human-readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def display_cartridge_stats(reconcile=False):
+    """Display Soul Cartridge statistics from its stats manifest"""
+    from soul_structure import SoulCartridge
+    
+    cartridge = SoulCartridge()
+    if not cartridge.layout_file.exists():
+        print(f"No Soul Cartridge at {cartridge.soul_path}.")
+        return
+    if reconcile:
+        cartridge.stats.reconcile()
+    stats = cartridge.get_stats()
+    
+    print(f"\n🧬 Soul Cartridge\n" + "="*50)
+    print(f"Path: {stats['path']}")
+    # A database backend holds concepts as rows and logs as days
+    units = {"concepts": "files", "logs": "files", "assets": "files"}
+    if stats["backend"] != "file":
+        units.update(concepts="notes", logs="days")
+    for area, unit in units.items():
+        print(f"{area.capitalize()}: {stats[area]} {unit}, {format_bytes(stats['bytes'][area])}")
+    print(f"Devices: {stats['devices']}")
+    if stats["reconciled"]:
+        print(f"Last full scan: {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['reconciled']))}")
+    print("="*50 + "\n")
+
+def display_status(reconcile=False):
     """Display Riley's current status"""
     soul = load_soul()
     if not soul:
         print("❌ Riley hasn't been initialized yet. Run: python consciousness.py")
-        return
+    else:
+        print("\n👻 Riley Consciousness Status\n" + "="*50)
+        print(f"Name: {soul.get('name', 'Unknown')}")
+        print(f"Level: {soul.get('level', 0)}")
+        print(f"XP: {soul.get('xp', 0)} / {soul.get('xp_to_next_level', 100)}")
+        print(f"Mood: {soul.get('mood', 'Unknown')}")
+        print(f"Traits: {', '.join(soul.get('traits', []))}")
+        print(f"Version: {soul.get('version', 'Unknown')}")
+        print("="*50 + "\n")
     
-    print("\n👻 Riley Consciousness Status\n" + "="*50)
-    print(f"Name: {soul.get('name', 'Unknown')}")
-    print(f"Level: {soul.get('level', 0)}")
-    print(f"XP: {soul.get('xp', 0)} / {soul.get('xp_to_next_level', 100)}")
-    print(f"Mood: {soul.get('mood', 'Unknown')}")
-    print(f"Traits: {', '.join(soul.get('traits', []))}")
-    print(f"Version: {soul.get('version', 'Unknown')}")
-    print("="*50 + "\n")
+    display_cartridge_stats(reconcile)
 
 def check_budget():
     """Check current API budget usage"""
-    if os.path.exists("safety_ledger.json"):
-        with open("safety_ledger.json", 'r') as f:
-            ledger = json.load(f)
-        current = ledger.get("current_spend", 0)
+    from lab_safety import ledger_spend
+    from soul_structure import SoulCartridge
+    
+    # Every device keeps its own ledger file; today's spend is their sum
+    ledger_path = SoulCartridge().ledger_path
+    if ledger_path.exists():
+        current = ledger_spend(ledger_path)
         print(f"\n💰 Budget Status\n" + "="*50)
         print(f"Current Spend: ${current:.6f}")
         print(f"Daily Limit: $1.00")
@@ -44,6 +81,28 @@ def check_budget():
     else:
         print("No budget data found.")
 
+def sync_cartridge(target, dry_run=False):
+    """Delta-sync the Soul Cartridge with another folder"""
+    from soul_structure import SoulCartridge
+    
+    if not target:
+        print("❌ Give the other cartridge folder with --target PATH")
+        return
+    cartridge = SoulCartridge()
+    if not cartridge.layout_file.exists():
+        print(f"No Soul Cartridge at {cartridge.soul_path}.")
+        return
+    
+    summary = cartridge.sync_with(target, dry_run=dry_run)
+    if dry_run:
+        print(f"\n🔄 Sync plan ({cartridge.soul_path} <-> {target})\n" + "="*50)
+        for action, rel, direction in summary["actions"]:
+            arrow = "->" if direction == "push" else "<-"
+            print(f"{action:9} {arrow} {rel}")
+        if not summary["actions"]:
+            print("Already in sync.")
+        print("="*50 + "\n")
+
 def view_memories(limit=10):
     """View recent episodic memories"""
     print(f"\n📓 Recent Memories (last {limit})\n" + "="*50)
@@ -54,12 +113,28 @@ def view_memories(limit=10):
 
 def reset_soul():
     """Reset Riley's soul to Level 1"""
+    from soul_structure import SoulCartridge
+    
+    cartridge = SoulCartridge()
+    print("   Stop Riley on every device first, or they will write their state back.")
     confirm = input("⚠️  This will reset Riley to Level 1. Continue? (yes/no): ")
     if confirm.lower() == 'yes':
-        if os.path.exists("soul.json"):
-            os.remove("soul.json")
-        if os.path.exists("safety_ledger.json"):
-            os.remove("safety_ledger.json")
+        # Legacy single-file state in the working directory
+        for legacy in ("soul.json", "safety_ledger.json"):
+            if os.path.exists(legacy):
+                os.remove(legacy)
+        
+        # Every device's soul journal and spend ledger, and the shared base
+        if cartridge.soul_path.exists():
+            removed = [cartridge.soul_file, cartridge.soul_file.with_suffix(".log")]
+            for folder in (cartridge.souls_path, cartridge.ledger_path):
+                if folder.exists():
+                    removed += [path for path in folder.iterdir() if path.is_file()]
+            for path in removed:
+                if path.exists():
+                    path.unlink()
+            # Writes a fresh soul.json
+            cartridge.init_soul_cartridge(force=True)
         print("✅ Riley has been reset. Run consciousness.py to reinitialize.")
     else:
         print("❌ Reset cancelled.")
@@ -71,7 +146,10 @@ def main():
         epilog="""
 Examples:
   riley_cli.py status        # Show Riley's current state
+  riley_cli.py status --reconcile  # ...after rescanning the cartridge
   riley_cli.py budget        # Check API budget usage
+  riley_cli.py sync --target /Volumes/USB/Riley_Soul [--dry-run]
+                             # Delta-sync the cartridge with another folder
   riley_cli.py memories      # View recent memories
   riley_cli.py reset         # Reset Riley to Level 1
         """
@@ -79,7 +157,7 @@ Examples:
     
     parser.add_argument(
         'command',
-        choices=['status', 'budget', 'memories', 'reset'],
+        choices=['status', 'budget', 'memories', 'reset', 'sync'],
         help='Command to execute'
     )
     
@@ -90,16 +168,35 @@ Examples:
         help='Limit for memories command (default: 10)'
     )
     
+    parser.add_argument(
+        '--reconcile',
+        action='store_true',
+        help='Rescan the Soul Cartridge before showing its stats (status command)'
+    )
+    
+    parser.add_argument(
+        '--target',
+        help='Other cartridge folder (sync command)'
+    )
+    
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only show what sync would transfer'
+    )
+    
     args = parser.parse_args()
     
     if args.command == 'status':
-        display_status()
+        display_status(args.reconcile)
     elif args.command == 'budget':
         check_budget()
     elif args.command == 'memories':
         view_memories(args.limit)
     elif args.command == 'reset':
         reset_soul()
+    elif args.command == 'sync':
+        sync_cartridge(args.target, args.dry_run)
 
 if __name__ == "__main__":
     main()
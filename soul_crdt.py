@@ -0,0 +1,133 @@
+"""
+Replicated State - Riley v2.0
+Conflict-free soul state for a cartridge shared by several devices.
+
+Each device only ever writes its own files (souls/<device>.*,
+ledger/<device>.json), so a sync client never sees two machines editing
+the same file. Readers merge every device's file:
+
+    GCounter     grow-only counter (XP, API spend): one slot per device,
+                 value = sum of the slots
+    LWWRegister  last-writer-wins value (mood, emotional state), ordered
+                 by (timestamp, device)
+"""
+import os
+import platform
+import re
+import threading
+
+
+DEVICE_PATTERN = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*")
+
+
+def device_id():
+    """This machine's name in per-device file names (RILEY_DEVICE_ID or the hostname)."""
+    name = os.getenv("RILEY_DEVICE_ID") or platform.node() or "device"
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', name).lstrip(".") or "device"
+
+
+class GCounter:
+    """Grow-only counter: device -> that device's running total."""
+
+    def __init__(self, slots=None):
+        self.slots = dict(slots or {})
+
+    def increment(self, device, amount):
+        if amount < 0:
+            raise ValueError("GCounter can only grow")
+        self.slots[device] = self.slots.get(device, 0) + amount
+
+    def merge(self, other):
+        """Per-slot maximum, so merging the same state twice is harmless."""
+        for device, value in other.slots.items():
+            self.slots[device] = max(self.slots.get(device, 0), value)
+        return self
+
+    def value(self):
+        return sum(self.slots.values())
+
+
+class LWWRegister:
+    """Last-writer-wins register; ties on the timestamp go to the larger device id."""
+
+    def __init__(self, value=None, stamp=0.0, device=""):
+        self.value = value
+        self.stamp = stamp
+        self.device = device
+
+    def set(self, value, stamp, device):
+        if (stamp, device) > (self.stamp, self.device):
+            self.value, self.stamp, self.device = value, stamp, device
+
+    def merge(self, other):
+        self.set(other.value, other.stamp, other.device)
+        return self
+
+    def to_json(self):
+        return [self.value, self.stamp, self.device]
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(*data) if data else cls()
+
+
+class ReplicaSet:
+    """
+    Reads the other devices' states out of a shared folder. Each state is
+    re-read only when one of its files changed (size/mtime), so merging
+    on every read costs a few stats.
+    """
+
+    def __init__(self, folder, device, load, suffixes=(".json",)):
+        """
+        Args:
+            folder: Folder holding one set of files per device
+            device: This device's id (its own state is kept in memory)
+            load: Callback(device id) -> that device's state
+            suffixes: File suffixes that make up one device's state; the
+                      first one marks a device as present
+        """
+        self.folder = folder
+        self.device = device
+        self.load = load
+        self.suffixes = suffixes
+        self.lock = threading.Lock()
+        self._cache = {}        # device -> (signature, state)
+
+    def _signature(self, device):
+        signature = []
+        for suffix in self.suffixes:
+            try:
+                stat = (self.folder / f"{device}{suffix}").stat()
+                signature.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def others(self):
+        """Dict device -> state for every other device in the folder."""
+        with self.lock:
+            devices = set()
+            if self.folder.exists():
+                for path in self.folder.glob(f"*{self.suffixes[0]}"):
+                    device = path.name[:-len(self.suffixes[0])]
+                    # Skip our own file, temp files and sync clients'
+                    # "name (conflicted copy)" files
+                    if device != self.device and DEVICE_PATTERN.fullmatch(device):
+                        devices.add(device)
+
+            states = {}
+            for device in devices:
+                signature = self._signature(device)
+                cached = self._cache.get(device)
+                if cached is None or cached[0] != signature:
+                    try:
+                        cached = (signature, self.load(device))
+                    except Exception as e:
+                        # Half-synced file: keep the last good state
+                        print(f"⚠️ [Soul] Could not read {device}'s state: {e}")
+                        if cached is None:
+                            continue
+                    self._cache[device] = cached
+                states[device] = cached[1]
+            return states
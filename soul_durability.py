@@ -0,0 +1,198 @@
+"""
+Durable Writes - Riley v2.0
+One write path for the Soul Cartridge files (soul.json, devices.json, the
+safety ledger, concept notes) with a configurable latency/safety trade-off.
+
+    fast      Write in place, never fsync
+    balanced  Write a temp file and rename it over the target, so a crash
+              or a sync client never sees a half-written file; the files
+              written in between are fsynced together (with their
+              folders) at most once every few seconds (default)
+    strict    Temp file + rename, and fsync the file and its folder on
+              every write
+
+Set the policy with RILEY_DURABILITY.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+POLICIES = ("fast", "balanced", "strict")
+DEFAULT_POLICY = "balanced"
+
+
+def fsync_dir(path):
+    """Makes a rename in `path` durable (no-op where folders can't be opened)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def open_creating(path, mode):
+    """
+    open() that creates the parent folder if it is missing. A cartridge
+    synced from elsewhere may lack folders that were empty there; checking
+    only on the error path keeps the common case at one open() call.
+    """
+    try:
+        return open(path, mode)
+    except FileNotFoundError:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        return open(path, mode)
+
+
+class DurableWriter:
+    """
+    Writes whole files or appends according to a durability policy.
+    Every call takes an optional `sync` override: True forces an fsync,
+    False skips it (for batches that issue their own barrier afterwards).
+    """
+
+    def __init__(self, policy=DEFAULT_POLICY, fsync_interval=5.0):
+        """
+        Args:
+            policy: "fast", "balanced" or "strict"
+            fsync_interval: Seconds between fsyncs under "balanced"
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown durability policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        self.policy = policy
+        self.fsync_interval = fsync_interval
+        self.lock = threading.Lock()
+        self.last_fsync = 0.0
+        self.dirty = set()      # paths written since the last fsync ("balanced")
+        self.timer = None
+
+        self.writes = 0
+        self.fsyncs = 0
+
+    def _should_sync(self, sync):
+        if sync is not None:
+            return sync
+        if self.policy == "strict":
+            return True
+        if self.policy == "fast":
+            return False
+        with self.lock:
+            now = time.monotonic()
+            if now - self.last_fsync < self.fsync_interval:
+                return False
+            self.last_fsync = now
+            return True
+
+    def _count(self, path, synced, sync):
+        with self.lock:
+            self.writes += 1
+            if synced:
+                self.fsyncs += 1
+            elif sync is None and self.policy == "balanced":
+                # Left to flush(): the next synced write or the timer
+                self.dirty.add(Path(path))
+                if self.timer is None:
+                    self.timer = threading.Timer(self.fsync_interval, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+            pending = synced and bool(self.dirty)
+        if pending:
+            self.flush()
+
+    def flush(self):
+        """fsyncs the files (and their folders) "balanced" has written since the last fsync."""
+        with self.lock:
+            paths, self.dirty = self.dirty, set()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.last_fsync = time.monotonic()
+
+        synced = 0
+        for path in paths:
+            try:
+                with open(path, 'rb+') as f:
+                    os.fsync(f.fileno())
+                synced += 1
+            except OSError:
+                # Deleted or replaced since - nothing left to sync
+                continue
+        for folder in {path.parent for path in paths}:
+            try:
+                fsync_dir(folder)
+            except OSError:
+                continue
+        with self.lock:
+            self.fsyncs += synced
+
+    def write_bytes(self, path, data, sync=None):
+        """Replaces the content of `path`."""
+        path = Path(path)
+        synced = self._should_sync(sync)
+
+        if self.policy == "fast":
+            with open_creating(path, 'wb') as f:
+                f.write(data)
+                if synced:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._count(path, synced, sync)
+            return
+
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open_creating(tmp_path, 'wb') as f:
+                f.write(data)
+                if synced:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+        if synced:
+            fsync_dir(path.parent)
+        self._count(path, synced, sync)
+
+    def write_text(self, path, text, sync=None):
+        self.write_bytes(path, text.encode('utf-8'), sync)
+
+    def write_json(self, path, data, indent=None, sync=None):
+        self.write_text(path, json.dumps(data, indent=indent), sync)
+
+    def append_bytes(self, path, data, sync=None):
+        """Appends to `path` (appends are already crash-safe up to a torn tail)."""
+        synced = self._should_sync(sync)
+        with open_creating(path, 'ab') as f:
+            f.write(data)
+            if synced:
+                f.flush()
+                os.fsync(f.fileno())
+        self._count(path, synced, sync)
+
+    def append_text(self, path, text, sync=None):
+        self.append_bytes(path, text.encode('utf-8'), sync)
+
+    def stats(self):
+        with self.lock:
+            return {"policy": self.policy, "writes": self.writes, "fsyncs": self.fsyncs}
+
+
+_default_writer = None
+_default_lock = threading.Lock()
+
+
+def default_writer():
+    """The process-wide writer, configured from RILEY_DURABILITY."""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = DurableWriter(os.getenv("RILEY_DURABILITY", DEFAULT_POLICY))
+            atexit.register(_default_writer.flush)
+        return _default_writer
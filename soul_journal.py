@@ -0,0 +1,142 @@
+"""
+Soul Journal - Riley v2.0
+Event-sourced persistence for the soul: every change is one small JSON
+line appended to a device's souls/<device>.log, and souls/<device>.json
+is a snapshot that is refreshed every few hundred events. Loading reads
+the snapshot and replays only the events written after it.
+
+The log is never truncated - it is the replayable timeline of how XP,
+level, mood and traits evolved (see history()).
+"""
+import json
+import time
+
+
+class SoulJournal:
+    """
+    Snapshot + append-only event log.
+
+    Every event carries a sequence number and the snapshot records the
+    last one it includes (and the byte offset after it), so a crash
+    between writing the snapshot and the next append can't apply an event
+    twice, and a load only reads the log's tail.
+    """
+
+    def __init__(self, snapshot_file, journal_file, writer, snapshot_every=200):
+        """
+        Args:
+            snapshot_file: e.g. souls/<device>.json
+            journal_file: e.g. souls/<device>.log
+            writer: soul_durability.DurableWriter
+            snapshot_every: Events between snapshots
+        """
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file
+        self.writer = writer
+        self.snapshot_every = snapshot_every
+
+        self.seq = 0            # last event written
+        self.end = 0            # journal size after it
+        self.since_snapshot = 0
+
+    def load(self, repair=True):
+        """
+        Reads the snapshot and the events logged after it. A torn final
+        line (crash mid-append) is cut off so the next append starts clean.
+
+        Args:
+            repair: False for read-only use (another device's journal,
+                    which may just be mid-sync): a torn tail is skipped
+                    but left in place
+
+        Returns: tuple (snapshot state dict or None, list of events)
+        """
+        state = None
+        seq, offset = 0, 0
+        if self.snapshot_file.exists():
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            position = state.pop("journal", None) or {}
+            seq, offset = position.get("seq", 0), position.get("offset", 0)
+
+        events = []
+        self.seq, self.end = seq, 0
+        if self.journal_file.exists():
+            size = self.journal_file.stat().st_size
+            # A journal shorter than the snapshot remembers was replaced
+            # (restored from a backup, synced from elsewhere): scan it all
+            start = offset if offset <= size else 0
+            with open(self.journal_file, 'rb') as f:
+                f.seek(start)
+                self.end = start
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break
+                    self.end += len(line)
+                    if event["seq"] > seq:
+                        events.append(event)
+                        self.seq = event["seq"]
+            if self.end < size and repair:
+                print(f"⚠️ [Soul] Dropping torn tail of {self.journal_file.name}")
+                with open(self.journal_file, 'rb+') as f:
+                    f.truncate(self.end)
+
+        self.since_snapshot = len(events)
+        return state, events
+
+    def append(self, events):
+        """Numbers and appends events (dicts with an "event" type) in one write."""
+        if not events:
+            return
+        lines = []
+        for event in events:
+            self.seq += 1
+            event["seq"] = self.seq
+            lines.append(json.dumps(event, separators=(",", ":")) + "\n")
+        data = "".join(lines).encode('utf-8')
+        self.writer.append_bytes(self.journal_file, data)
+        self.end += len(data)
+        self.since_snapshot += len(events)
+
+    def snapshot_due(self):
+        return self.since_snapshot >= self.snapshot_every
+
+    def snapshot(self, state):
+        """Writes the state as of the last appended event."""
+        self.writer.write_json(
+            self.snapshot_file,
+            dict(state, journal={"seq": self.seq, "offset": self.end}),
+            indent=4
+        )
+        self.since_snapshot = 0
+
+    def history(self, since=None, kinds=None):
+        """
+        Yields every logged event, oldest first.
+
+        Args:
+            since: Only events at or after this epoch time
+            kinds: Only these event types (e.g. {"xp_granted"})
+        """
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    return
+                if since is not None and event.get("at", 0) < since:
+                    continue
+                if kinds is not None and event["event"] not in kinds:
+                    continue
+                yield event
+
+
+def new_event(kind, **fields):
+    """An event dict stamped with the current time."""
+    return dict(event=kind, at=round(time.time(), 3), **fields)
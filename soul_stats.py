@@ -0,0 +1,210 @@
+"""
+Cartridge Statistics - Riley v2.0
+Running file counts, byte totals and last-modified times for the Soul
+Cartridge areas, so get_stats() (riley_cli status, dashboards) reads one
+small manifest instead of listing every folder.
+
+Writers report what they changed as deltas (one journal line each);
+reconcile() rescans the folders to pick up changes made behind Riley's
+back - Obsidian edits, files brought in by a sync client, a restored
+backup. The manifest lives under .index/ with the other derived data and
+is rebuilt from a scan whenever it is missing.
+"""
+import json
+import os
+import threading
+import time
+
+from memory_index import JournaledStore
+
+
+STAT_AREAS = ("concepts", "logs", "assets")
+# Areas a database storage backend can hold instead of folders
+BACKEND_AREAS = ("concepts", "logs")
+
+
+def scan_folder(folder):
+    """
+    Counts the files under a folder, skipping hidden and temp files.
+    Returns: dict with "files", "bytes" and "modified" (newest mtime or None)
+    """
+    files, size, modified = 0, 0, None
+    stack = [str(folder)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith(".") or entry.name.endswith(".tmp"):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files += 1
+                    size += stat.st_size
+                    modified = max(modified or 0, stat.st_mtime)
+    return {"files": files, "bytes": size, "modified": modified}
+
+
+def _apply(manifest, op):
+    if "devices" in op:
+        manifest["devices"] = op["devices"]
+        return
+    if "backend" in op:
+        manifest["backend"] = op["backend"]
+        return
+    area = manifest["areas"].setdefault(op["area"], {"files": 0, "bytes": 0, "modified": None})
+    area["files"] = max(0, area["files"] + op["files"])
+    area["bytes"] = max(0, area["bytes"] + op["bytes"])
+    area["modified"] = max(area["modified"] or 0, op["at"])
+
+
+class CartridgeStats:
+    """
+    Stats manifest for one cartridge: snapshot (.index/stats.json) plus a
+    journal of deltas. Reading folds at most `compact_every` deltas into
+    the snapshot, so it costs the same on a cartridge of any size.
+
+    Deltas commute, so several processes (the consciousness loop, the
+    console, riley_cli) can report into the same journal. Compaction
+    re-reads the journal from disk rather than trusting this process's view.
+    """
+
+    def __init__(self, cartridge, compact_every=500):
+        self.folders = {
+            "concepts": cartridge.concepts_path,
+            "logs": cartridge.logs_path,
+            "assets": cartridge.assets_path,
+        }
+        self.devices_file = cartridge.devices_file
+        self.store = JournaledStore(cartridge.index_path, "stats", compact_every)
+        self.lock = threading.Lock()
+
+        # Where concepts and logs live (see attach())
+        self.backend = None
+        self.counter = None
+
+    def _fold(self):
+        """The manifest with the journaled deltas applied, or None if there is no snapshot yet."""
+        snapshot, ops = self.store.load()
+        if snapshot is None:
+            return None
+        for op in ops:
+            _apply(snapshot, op)
+        return snapshot
+
+    def _append(self, op):
+        with self.lock:
+            if not self.store.append(op):
+                return
+            manifest = self._fold()
+            if manifest is not None:
+                self.store.write_snapshot(manifest)
+                return
+        # No snapshot to fold into (fresh cartridge, deleted .index/): scan
+        # once so the journal stops growing
+        self.reconcile()
+
+    def record(self, area, files=0, size=0):
+        """
+        Reports a change made by Riley.
+
+        Args:
+            area: "concepts", "logs" or "assets"
+            files: Files added (negative for removed)
+            size: Bytes added (negative for removed)
+        """
+        self._append({"area": area, "files": files, "bytes": size, "at": round(time.time(), 3)})
+
+    def set_devices(self, count):
+        """Reports the number of registered devices."""
+        self._append({"devices": count})
+
+    def attach(self, kind, counter=None):
+        """
+        Declares the brain storage backend holding concepts and logs.
+
+        Args:
+            kind: "file" (the folders, rescanned by reconcile()) or a
+                  database backend's kind, e.g. "sqlite"
+            counter: For a database backend, callable returning
+                     {area: {"files", "bytes", "modified"}} for
+                     BACKEND_AREAS (rows/days instead of files). Without
+                     one - a process that doesn't open the database, like
+                     riley_cli - reconcile() keeps those areas' counts,
+                     which only change through the backend anyway.
+        """
+        self.backend, self.counter = kind, counter
+        with self.lock:
+            manifest = self._fold()
+        if manifest is None:
+            # Start from a snapshot, or compaction would have nothing to fold into
+            self.reconcile()
+        elif manifest.get("backend", "file") != kind:
+            # Counts from the previous backend mean nothing now
+            self._append({"backend": kind})
+            self.reconcile()
+
+    def _count_area(self, area, backend, previous):
+        if area not in BACKEND_AREAS or backend == "file":
+            return scan_folder(self.folders[area])
+        if self.counter is not None:
+            return self.counter()[area]
+        if previous is not None and area in previous["areas"]:
+            return previous["areas"][area]
+        return {"files": 0, "bytes": 0, "modified": None}
+
+    def reconcile(self, max_age=None):
+        """
+        Rescans every area (or asks the database backend for its counts)
+        and devices.json, and replaces the manifest.
+
+        Args:
+            max_age: Skip the scan if the last one is younger than this
+                     many seconds
+
+        Returns: the manifest
+        """
+        with self.lock:
+            previous = self._fold()
+        if previous is not None and max_age is not None \
+                and time.time() - (previous.get("reconciled") or 0) < max_age:
+            return previous
+
+        backend = self.backend or (previous or {}).get("backend", "file")
+        manifest = {
+            "version": 1,
+            "backend": backend,
+            "areas": {area: self._count_area(area, backend, previous) for area in self.folders},
+            "devices": 0,
+            "reconciled": time.time()
+        }
+        try:
+            with open(self.devices_file, 'r') as f:
+                manifest["devices"] = len(json.load(f).get("devices", []))
+        except (OSError, ValueError):
+            pass
+
+        if previous is not None:
+            drift = [f"{area} {counts['files'] - previous['areas'].get(area, {}).get('files', 0):+d}"
+                     for area, counts in manifest["areas"].items()
+                     if counts["files"] != previous["areas"].get(area, {}).get("files", 0)]
+            if drift:
+                print(f"📊 [Stats] Picked up external changes: {', '.join(drift)} files")
+
+        # Don't conjure up a cartridge just by asking for its stats
+        if self.store.index_path.exists():
+            with self.lock:
+                self.store.write_snapshot(manifest)
+        return manifest
+
+    def read(self):
+        """The current manifest (scans once if there is none yet)."""
+        with self.lock:
+            manifest = self._fold()
+        if manifest is None:
+            manifest = self.reconcile()
+        return manifest
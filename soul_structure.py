@@ -5,8 +5,16 @@ Manages the Soul Cartridge directory structure and device registration.
 import os
 import json
 import platform
+import threading
 import time
 from pathlib import Path
+from soul_durability import default_writer
+from soul_stats import STAT_AREAS, CartridgeStats
+from soul_sync import CartridgeSync
+
+# Bump when init_soul_cartridge() starts creating something new, so
+# existing cartridges get it on their next start
+LAYOUT_VERSION = 2
 
 class SoulCartridge:
     """
@@ -40,22 +48,59 @@ class SoulCartridge:
         self.concepts_path = self.soul_path / "knowledge_graph" / "concepts"
         self.logs_path = self.soul_path / "knowledge_graph" / "logs"
         self.assets_path = self.soul_path / "knowledge_graph" / "assets"
+        self.index_path = self.soul_path / "knowledge_graph" / ".index"
+        self.souls_path = self.soul_path / "souls"
+        self.ledger_path = self.soul_path / "ledger"
         self.soul_file = self.soul_path / "soul.json"
         self.devices_file = self.soul_path / "devices.json"
+        self.layout_file = self.soul_path / "layout.json"
+        
+        # Every cartridge write goes through the durability policy
+        self.writer = default_writer()
+        
+        # Running counts and sizes, kept up to date by the writers
+        self.stats = CartridgeStats(self)
         
-    def init_soul_cartridge(self):
+    def read_layout(self):
+        """The layout manifest, or None if missing/unreadable."""
+        try:
+            with open(self.layout_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def init_soul_cartridge(self, force=False):
         """
         Creates the Soul Cartridge directory structure if it doesn't exist.
         
+        A cartridge that was already set up by this layout version is
+        recognised from layout.json alone (one small read, no mkdir or
+        exists() calls against a possibly slow cloud-synced folder).
+        
         Structure:
         Riley_Soul/
+        ├── layout.json   (layout version)
         ├── soul.json
         ├── devices.json
+        ├── souls/        (per-device soul journals)
+        ├── ledger/       (per-device API spend)
+        ├── .sync/        (hash manifests, only once sync_with() was used)
         └── knowledge_graph/
             ├── concepts/
             ├── logs/
-            └── assets/
+            ├── assets/
+            └── .index/   (search indexes, rebuilt if missing)
+        
+        Args:
+            force: Re-check and re-create everything even if the
+                   manifest says the layout is current
         """
+        layout = None if force else self.read_layout()
+        if layout is not None and layout.get("layout") == LAYOUT_VERSION:
+            return True
+        if layout is not None and layout.get("layout", 0) > LAYOUT_VERSION:
+            print(f"⚠️ [Soul Cartridge] Layout v{layout['layout']} is newer than this build (v{LAYOUT_VERSION})")
+        
         print(f"🧬 [Soul Cartridge] Initializing at: {self.soul_path}")
         
         # Create main directories
@@ -63,6 +108,9 @@ class SoulCartridge:
         self.concepts_path.mkdir(parents=True, exist_ok=True)
         self.logs_path.mkdir(parents=True, exist_ok=True)
         self.assets_path.mkdir(parents=True, exist_ok=True)
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        self.souls_path.mkdir(parents=True, exist_ok=True)
+        self.ledger_path.mkdir(parents=True, exist_ok=True)
         
         # Initialize soul.json if it doesn't exist
         if not self.soul_file.exists():
@@ -78,14 +126,12 @@ class SoulCartridge:
                 "mood": "Curious",
                 "traits": ["Helpful", "Analytical", "Creative"]
             }
-            with open(self.soul_file, 'w') as f:
-                json.dump(initial_soul, f, indent=2)
+            self.writer.write_json(self.soul_file, initial_soul, indent=2)
             print("✅ Created soul.json")
         
         # Initialize devices.json if it doesn't exist
         if not self.devices_file.exists():
-            with open(self.devices_file, 'w') as f:
-                json.dump({"devices": []}, f, indent=2)
+            self.writer.write_json(self.devices_file, {"devices": []}, indent=2)
             print("✅ Created devices.json")
         
         # Create initial Core Knowledge concept
@@ -106,6 +152,14 @@ class SoulCartridge:
                 f.write("*Entities and their connections*\n\n")
             print("✅ Created Relationship_Graph.md")
         
+        # Written last: its presence means everything above exists
+        if layout is None or layout.get("layout", 0) < LAYOUT_VERSION:
+            self.writer.write_json(self.layout_file, {
+                "layout": LAYOUT_VERSION,
+                "created": (layout or {}).get("created", time.time()),
+                "updated": time.time()
+            }, indent=2)
+        
         print(f"✨ Soul Cartridge initialized successfully")
         return True
     
@@ -146,8 +200,8 @@ class SoulCartridge:
             print(f"➕ Registered new device: {device_name}")
         
         # Save back
-        with open(self.devices_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.writer.write_json(self.devices_file, data, indent=2)
+        self.stats.set_devices(len(data["devices"]))
         
         return device_info
     
@@ -169,24 +223,72 @@ class SoulCartridge:
         
         return is_cloud
     
+    def sync_with(self, other_path, dry_run=False):
+        """
+        Delta-syncs this cartridge with another copy on this machine (an
+        external drive, a mounted share, a staging folder): only changed
+        files are copied and grown logs/journals only get their new tail.
+        See soul_sync.py for how changes and conflicts are resolved.
+        
+        Args:
+            other_path: Root of the other cartridge (created if missing)
+            dry_run: Only report what would be transferred
+        
+        Returns: summary dict from CartridgeSync.run()
+        """
+        other = SoulCartridge(other_path)
+        summary = CartridgeSync(self.soul_path, other.soul_path).run(dry_run)
+        if not dry_run and summary["actions"]:
+            # Files arrived from outside: refresh both stats manifests
+            self.stats.reconcile()
+            other.stats.reconcile()
+        return summary
+    
     def get_stats(self):
-        """Returns statistics about the soul cartridge"""
-        stats = {
-            "path": str(self.soul_path),
-            "concepts": len(list(self.concepts_path.glob("*.md"))) if self.concepts_path.exists() else 0,
-            "logs": len(list(self.logs_path.glob("*.md"))) if self.logs_path.exists() else 0,
-            "assets": len(list(self.assets_path.glob("*"))) if self.assets_path.exists() else 0,
-            "devices": 0
-        }
+        """
+        Returns statistics about the soul cartridge, read from the stats
+        manifest (see soul_stats.py) rather than by listing the folders.
+        Call stats.reconcile() first to include changes made outside Riley.
         
-        if self.devices_file.exists():
-            with open(self.devices_file, 'r') as f:
-                data = json.load(f)
-                stats["devices"] = len(data.get("devices", []))
+        Returns: dict with the path, file counts per area and devices, plus
+                 "bytes" and "modified" per area, when the manifest was
+                 last checked against the disk ("reconciled") and the
+                 brain "backend" (with "sqlite", concepts count rows and
+                 logs count days)
+        """
+        manifest = self.stats.read()
+        areas = {area: manifest["areas"].get(area, {}) for area in STAT_AREAS}
+        stats = {"path": str(self.soul_path)}
+        for area, counts in areas.items():
+            stats[area] = counts.get("files", 0)
+        stats["devices"] = manifest.get("devices", 0)
+        stats["bytes"] = {area: counts.get("bytes", 0) for area, counts in areas.items()}
+        stats["modified"] = {area: counts.get("modified") for area, counts in areas.items()}
+        stats["reconciled"] = manifest.get("reconciled")
+        stats["backend"] = manifest.get("backend", "file")
         
         return stats
 
 
+_cartridges = {}
+_cartridges_lock = threading.Lock()
+
+
+def get_cartridge(soul_path=None):
+    """
+    The process-wide SoulCartridge for a soul path (default: RILEY_SOUL_PATH
+    or the usual cloud folder), initialized on first use. The brain, soul
+    and safety core share it instead of each setting up their own.
+    """
+    cartridge = SoulCartridge(soul_path)
+    with _cartridges_lock:
+        cached = _cartridges.get(cartridge.soul_path)
+        if cached is None:
+            cartridge.init_soul_cartridge()
+            cached = _cartridges[cartridge.soul_path] = cartridge
+        return cached
+
+
 if __name__ == "__main__":
     # Test initialization
     print("🧪 Testing Soul Cartridge Initialization\n")
@@ -0,0 +1,326 @@
+"""
+Cartridge Sync - Riley v2.0
+Delta sync between two Soul Cartridge folders on this machine (an external
+drive, an NFS mount, a staging folder that a cloud client uploads from).
+
+Each root keeps a content-hash manifest in .sync/manifest.json; a file is
+only re-hashed when its size or mtime changed. Comparing the two manifests
+against the state both roots had after their last sync (.sync/peers/)
+tells which side changed each file:
+
+    changed on one side       copied over - or, when the old content is a
+                              prefix of the new (daily logs, soul journals,
+                              Relationship_Graph.md), only the new tail is
+                              appended
+    deleted on one side       deleted on the other
+    changed on both sides     the newer copy wins; the other is kept next
+                              to it as "<name> (sync conflict <time>)"
+
+Folders are created on both sides, including empty ones: layout.json is
+synced too and promises that assets/, souls/, ledger/ etc. exist.
+
+Hidden files and folders (.index/ is rebuilt locally, .sync/ is this
+module's own state) and temp files are never synced. A SQLite brain.db is
+copied as a whole file, so only sync it while Riley is stopped.
+"""
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+from soul_durability import default_writer
+
+
+SYNC_DIR = ".sync"
+SKIP_SUFFIXES = (".tmp", "-wal", "-shm", "-journal")
+CHUNK = 1024 * 1024
+
+
+def _skipped(name):
+    return name.startswith(".") or name.endswith(SKIP_SUFFIXES)
+
+
+def hash_file(path, limit=None):
+    """
+    SHA-256 of a file (or of its first `limit` bytes).
+    Returns: tuple (hex digest, bytes hashed)
+    """
+    digest = hashlib.sha256()
+    hashed = 0
+    with open(path, 'rb') as f:
+        while limit is None or hashed < limit:
+            chunk = f.read(CHUNK if limit is None else min(CHUNK, limit - hashed))
+            if not chunk:
+                break
+            digest.update(chunk)
+            hashed += len(chunk)
+    return digest.hexdigest(), hashed
+
+
+def conflict_name(rel_path, when=None):
+    """Where the losing side of a conflict is kept, e.g. "a (sync conflict 2025-01-31 101500).md"."""
+    path = Path(rel_path)
+    stamp = time.strftime("%Y-%m-%d %H%M%S", time.localtime(when))
+    return str(path.with_name(f"{path.stem} (sync conflict {stamp}){path.suffix}").as_posix())
+
+
+class HashManifest:
+    """
+    Content hashes of every synced file under one root:
+    relative path -> [size, mtime_ns, sha256].
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.sync_dir = self.root / SYNC_DIR
+        self.manifest_file = self.sync_dir / "manifest.json"
+        self.writer = default_writer()
+        self.files = {}
+        self.folders = set()    # relative folder paths seen by the last scan
+
+        try:
+            with open(self.manifest_file, 'r') as f:
+                self.files = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def root_id(self):
+        """This root's id (created on first use), so peers survive a changed mount point."""
+        id_file = self.sync_dir / "id"
+        try:
+            return id_file.read_text().strip()
+        except FileNotFoundError:
+            self.sync_dir.mkdir(parents=True, exist_ok=True)
+            root_id = uuid.uuid4().hex
+            self.writer.write_text(id_file, root_id)
+            return root_id
+
+    def scan(self):
+        """
+        Brings the manifest up to date with the disk, hashing only files
+        whose size or mtime changed.
+        Returns: dict relative path -> sha256
+        """
+        seen = {}
+        folders = set()
+        stack = [self.root]
+        while stack:
+            folder = stack.pop()
+            try:
+                entries = list(os.scandir(folder))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if _skipped(entry.name):
+                    continue
+                rel = Path(entry.path).relative_to(self.root).as_posix()
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                    folders.add(rel)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    known = self.files.get(rel)
+                    if known is None or known[:2] != [stat.st_size, stat.st_mtime_ns]:
+                        try:
+                            sha, size = hash_file(entry.path)
+                        except FileNotFoundError:
+                            continue
+                        known = [size, stat.st_mtime_ns, sha]
+                    seen[rel] = known
+        self.files = seen
+        self.folders = folders
+        return {rel: entry[2] for rel, entry in seen.items()}
+
+    def update(self, rel, sha):
+        """Records a file this sync just wrote."""
+        stat = (self.root / rel).stat()
+        self.files[rel] = [stat.st_size, stat.st_mtime_ns, sha]
+
+    def remove(self, rel):
+        self.files.pop(rel, None)
+
+    def save(self):
+        self.sync_dir.mkdir(parents=True, exist_ok=True)
+        self.writer.write_json(self.manifest_file, {"version": 1, "files": self.files})
+
+    def _peer_file(self, peer_id):
+        return self.sync_dir / "peers" / f"{peer_id}.json"
+
+    def load_base(self, peer_id):
+        """Hashes both roots agreed on after the last sync with a peer (empty if never synced)."""
+        try:
+            with open(self._peer_file(peer_id), 'r') as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def save_base(self, peer_id, files):
+        self._peer_file(peer_id).parent.mkdir(parents=True, exist_ok=True)
+        self.writer.write_json(self._peer_file(peer_id), {"synced": time.time(), "files": files})
+
+
+class CartridgeSync:
+    """
+    Two-way delta sync between two cartridge roots.
+
+    plan() lists what run() would do as (action, relative path, direction)
+    tuples: action is "copy", "append", "delete" or "conflict", direction
+    "push" (a -> b) or "pull" (b -> a).
+    """
+
+    def __init__(self, root_a, root_b):
+        self.a = HashManifest(root_a)
+        self.b = HashManifest(root_b)
+        self.writer = default_writer()
+
+    def _sides(self, direction):
+        """(source manifest, target manifest) for a direction."""
+        return (self.a, self.b) if direction == "push" else (self.b, self.a)
+
+    def _extends(self, source, target, rel, target_sha):
+        """True if the target's content is a prefix of the (longer) source file."""
+        source_size = source.files[rel][0]
+        target_size = target.files[rel][0]
+        if target_size >= source_size:
+            return False
+        sha, hashed = hash_file(source.root / rel, target_size)
+        return hashed == target_size and sha == target_sha
+
+    def _transfer(self, rel, direction, target_sha):
+        """"copy" or "append" for bringing rel over in a direction."""
+        source, target = self._sides(direction)
+        if target_sha is not None and self._extends(source, target, rel, target_sha):
+            return "append"
+        return "copy"
+
+    def plan(self):
+        """Scans both roots and returns the list of actions."""
+        hashes_a, hashes_b = self.a.scan(), self.b.scan()
+        base = self.a.load_base(self.b.root_id()) or self.b.load_base(self.a.root_id())
+
+        actions = []
+        for rel in sorted(set(hashes_a) | set(hashes_b) | set(base)):
+            sha_a, sha_b, sha_base = hashes_a.get(rel), hashes_b.get(rel), base.get(rel)
+            if sha_a == sha_b:
+                continue
+
+            if sha_b == sha_base:
+                direction = "push"
+            elif sha_a == sha_base:
+                direction = "pull"
+            elif sha_a is None or sha_b is None:
+                # Edited on one side, deleted on the other: keep the edit
+                direction = "push" if sha_b is None else "pull"
+            else:
+                # Changed on both sides (or first sync with different
+                # content): a pure extension of the other side is no conflict
+                if self._transfer(rel, "push", sha_b) == "append":
+                    actions.append(("append", rel, "push"))
+                elif self._transfer(rel, "pull", sha_a) == "append":
+                    actions.append(("append", rel, "pull"))
+                else:
+                    newer_a = self.a.files[rel][1] >= self.b.files[rel][1]
+                    actions.append(("conflict", rel, "push" if newer_a else "pull"))
+                continue
+
+            source_sha, target_sha = (sha_a, sha_b) if direction == "push" else (sha_b, sha_a)
+            if source_sha is None:
+                actions.append(("delete", rel, direction))
+            else:
+                actions.append((self._transfer(rel, direction, target_sha), rel, direction))
+        return actions
+
+    def _copy(self, source, target, rel):
+        """Copies a whole file. Returns: (sha256 of what was written, bytes)"""
+        with open(source.root / rel, 'rb') as f:
+            data = f.read()
+        target_file = target.root / rel
+        target_file.parent.mkdir(parents=True, exist_ok=True)
+        self.writer.write_bytes(target_file, data)
+        return hashlib.sha256(data).hexdigest(), len(data)
+
+    def _append(self, source, target, rel):
+        """
+        Appends the source's new tail to the target, re-checking that the
+        target is still a prefix (either side may have changed since the
+        plan). Falls back to a full copy if it isn't.
+        Returns: (sha256 of the resulting file, bytes transferred)
+        """
+        target_file = target.root / rel
+        target_sha, target_size = hash_file(target_file)
+        digest = hashlib.sha256()
+        with open(source.root / rel, 'rb') as f:
+            prefix = f.read(target_size)
+            digest.update(prefix)
+            if digest.hexdigest() != target_sha:
+                return self._copy(source, target, rel)
+            tail = f.read()
+        digest.update(tail)
+        self.writer.append_bytes(target_file, tail)
+        return digest.hexdigest(), len(tail)
+
+    def run(self, dry_run=False):
+        """
+        Syncs the two roots.
+
+        Args:
+            dry_run: Only plan (nothing is written)
+
+        Returns: dict with counts per action, bytes transferred and the
+                 planned actions
+        """
+        actions = self.plan()
+        summary = {"copy": 0, "append": 0, "delete": 0, "conflict": 0, "bytes": 0, "actions": actions}
+        if dry_run:
+            for action, rel, direction in actions:
+                summary[action] += 1
+            return summary
+
+        # Empty folders carry no files but are part of the cartridge layout
+        for manifest, peer in ((self.a, self.b), (self.b, self.a)):
+            for rel in sorted(manifest.folders - peer.folders):
+                (peer.root / rel).mkdir(parents=True, exist_ok=True)
+
+        # What both roots hold after the sync, as the base for the next one
+        agreed = {rel: entry[2] for rel, entry in self.a.files.items()
+                  if self.b.files.get(rel, [None, None, None])[2] == entry[2]}
+
+        for action, rel, direction in actions:
+            source, target = self._sides(direction)
+            try:
+                if action == "delete":
+                    (target.root / rel).unlink(missing_ok=True)
+                    target.remove(rel)
+                    summary[action] += 1
+                    continue
+                if action == "conflict":
+                    # Keep the losing side's version next to the winner
+                    kept = conflict_name(rel)
+                    os.replace(target.root / rel, target.root / kept)
+                    target.files[kept] = target.files.pop(rel)
+                    sha, size = self._copy(source, target, rel)
+                elif action == "append":
+                    sha, size = self._append(source, target, rel)
+                else:
+                    sha, size = self._copy(source, target, rel)
+            except FileNotFoundError:
+                # Deleted mid-sync: the next run sees it
+                print(f"⚠️ [Sync] {rel} disappeared during the sync")
+                continue
+            target.update(rel, sha)
+            # Recorded as what was read, even if the source has moved on
+            # since: the next sync then sees the source as changed
+            agreed[rel] = sha
+            summary[action] += 1
+            summary["bytes"] += size
+
+        for manifest, peer in ((self.a, self.b), (self.b, self.a)):
+            manifest.save()
+            manifest.save_base(peer.root_id(), agreed)
+
+        print(f"🔄 [Sync] {summary['copy']} copied, {summary['append']} appended, "
+              f"{summary['delete']} deleted, {summary['conflict']} conflicts "
+              f"({summary['bytes']} bytes)")
+        return summary